@@ -0,0 +1,226 @@
+import sqlite3
+import threading
+import time
+import queue
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional, Set, Tuple
+
+from config.config import (
+    API_KEY_CACHE_REFRESH_SECONDS,
+    API_KEY_CACHE_POLL_SECONDS,
+    API_USAGE_BATCH_SIZE,
+    API_USAGE_FLUSH_SECONDS,
+    API_USAGE_QUEUE_SIZE,
+)
+
+logger = logging.getLogger("api_keys")
+
+
+class ApiKeyCache:
+    """
+    In-memory view of the `api_keys` table.
+
+    Valid keys are held as a snapshot of the whole table, which a background
+    thread reloads whenever SQLite reports the database changed or the
+    refresh interval elapses. Every lookup, including one for an unknown
+    key, is answered from the snapshot, so bad keys never reach the
+    database. Adding or revoking a key takes effect on the next reload,
+    within `poll_seconds`; call `refresh()` after writing a key to see it
+    at once.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        refresh_seconds: float = API_KEY_CACHE_REFRESH_SECONDS,
+        poll_seconds: float = API_KEY_CACHE_POLL_SECONDS,
+    ):
+        self.db_path = db_path
+        self.refresh_seconds = refresh_seconds
+        self.poll_seconds = poll_seconds
+
+        self._valid_keys: Set[str] = set()
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _load_keys(self, connection: sqlite3.Connection) -> Set[str]:
+        cursor = connection.execute("SELECT api_key FROM api_keys")
+        return {row[0] for row in cursor.fetchall()}
+
+    def refresh(self, connection: Optional[sqlite3.Connection] = None) -> None:
+        """Reload the valid key snapshot."""
+        own_connection = connection is None
+        if own_connection:
+            connection = sqlite3.connect(self.db_path)
+        try:
+            keys = self._load_keys(connection)
+        except sqlite3.Error as e:
+            logger.error(f"API key refresh failed: {e}")
+            return
+        finally:
+            if own_connection:
+                connection.close()
+
+        with self._lock:
+            self._valid_keys = keys
+            self._loaded_at = time.monotonic()
+        logger.debug(f"Loaded {len(keys)} API keys")
+
+    def is_valid(self, api_key: str) -> bool:
+        """Return True if the key is in the current snapshot."""
+        # The snapshot is replaced, never mutated, so no lock is needed
+        return api_key in self._valid_keys
+
+    def start(self) -> None:
+        """Load the keys and start the background refresh thread."""
+        if self._thread is not None:
+            return
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="api-key-cache", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @staticmethod
+    def _data_version(connection: sqlite3.Connection) -> int:
+        # fetchall() steps the statement to completion so it does not pin
+        # a read snapshot between polls
+        return connection.execute("PRAGMA data_version").fetchall()[0][0]
+
+    def _run(self) -> None:
+        # `PRAGMA data_version` changes whenever another connection commits,
+        # which makes polling it a cheap way to notice edits to api_keys.
+        connection = sqlite3.connect(self.db_path)
+        try:
+            last_version = self._data_version(connection)
+            # Reload once on this connection so commits that landed between
+            # start() and the first poll are not missed
+            self.refresh(connection)
+            while not self._stop.wait(self.poll_seconds):
+                version = self._data_version(connection)
+                stale = time.monotonic() - self._loaded_at >= self.refresh_seconds
+                if version != last_version or stale:
+                    last_version = version
+                    self.refresh(connection)
+        except sqlite3.Error as e:
+            logger.error(f"API key refresh thread stopped: {e}")
+        finally:
+            connection.close()
+
+
+class UsageLogger:
+    """
+    Records rows for `api_key_usage` off the request path.
+
+    Requests only enqueue an event. A background writer drains the queue and
+    inserts events with `executemany` in one transaction per batch, flushing
+    when `batch_size` events are waiting or `flush_seconds` has passed since
+    the first one arrived. `stop()` drains whatever is left.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = API_USAGE_BATCH_SIZE,
+        flush_seconds: float = API_USAGE_FLUSH_SECONDS,
+        queue_size: int = API_USAGE_QUEUE_SIZE,
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def log(self, api_key: str, endpoint: str, request_body: str) -> None:
+        """Queue a usage event, stamped now; drops it if the queue is full."""
+        # Same format as SQLite's CURRENT_TIMESTAMP (UTC)
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self._queue.put_nowait((api_key, endpoint, timestamp, request_body))
+        except queue.Full:
+            logger.warning(f"Usage queue full, dropping event for {endpoint}")
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="api-usage-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush pending events and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        connection = sqlite3.connect(self.db_path)
+        try:
+            stopping = False
+            while not stopping:
+                batch: List[Tuple[str, str, str, str]] = []
+                item = self._queue.get()
+                deadline = time.monotonic() + self.flush_seconds
+
+                while True:
+                    if item is self._STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+
+                if stopping:
+                    # Drain anything queued behind the stop marker
+                    while True:
+                        try:
+                            item = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is not self._STOP:
+                            batch.append(item)
+
+                self._write(connection, batch)
+        finally:
+            connection.close()
+
+    def _write(
+        self, connection: sqlite3.Connection, batch: List[Tuple[str, str, str, str]]
+    ) -> None:
+        if not batch:
+            return
+        try:
+            with connection:
+                connection.executemany(
+                    """
+                    INSERT INTO api_key_usage (api_key, endpoint, timestamp, request_body)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    batch,
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write {len(batch)} usage events: {e}")
@@ -0,0 +1,181 @@
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List
+
+import openai
+
+from database import ChunkManager
+from embedding import batch_by_tokens, count_tokens
+from utils.openai import generate_embeddings
+from vector_store import add_to_vector_index
+from config.config import (
+    EMBEDDING_WORKERS,
+    EMBEDDING_RPM,
+    EMBEDDING_TPM,
+    EMBEDDING_MAX_RETRIES,
+)
+
+logger = logging.getLogger("backfill_embeddings")
+
+# Chunks read from SQLite per page
+PAGE_SIZE = 5000
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> None:
+        """Block until `amount` tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait_seconds = (amount - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+class EmbeddingBackfill:
+    """
+    Embeds every chunk whose embedding is NULL with a bounded pool of
+    workers. Requests are paced by request and token buckets matched to the
+    provider's RPM/TPM limits, retryable API errors (429s, timeouts, 5xx)
+    back off exponentially, and a failing batch is logged and left for the
+    next run instead of aborting the job.
+
+    Each batch is stored as soon as it is embedded, and only chunks whose
+    embedding is still NULL are read, so an interrupted run needs no
+    checkpoint: the next one picks up whatever is left.
+    """
+
+    def __init__(
+        self,
+        workers: int = EMBEDDING_WORKERS,
+        requests_per_minute: int = EMBEDDING_RPM,
+        tokens_per_minute: int = EMBEDDING_TPM,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+    ):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.embedded = 0
+        self.failed = 0
+
+    def embed_batch(self, batch: List[Dict]) -> List[tuple]:
+        """Embed and store one batch, retrying retryable API errors."""
+        texts = [chunk["text"] for chunk in batch]
+        tokens = sum(count_tokens(text) for text in texts)
+
+        for attempt in range(self.max_retries + 1):
+            self.request_bucket.acquire()
+            self.token_bucket.acquire(tokens)
+            try:
+                embeddings = generate_embeddings(texts)
+                break
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                logger.warning(
+                    f"{type(e).__name__} on batch of {len(batch)}, retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+        entries = [
+            (chunk["id"], chunk["project_id"], embedding)
+            for chunk, embedding in zip(batch, embeddings)
+        ]
+        ChunkManager.set_embeddings(
+            [(chunk_id, embedding) for chunk_id, _, embedding in entries]
+        )
+        return entries
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        # Honour the server's Retry-After when it sends one
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return min(60.0, 2**attempt) + random.uniform(0, 1)
+
+    def run(self) -> None:
+        logger.info("Starting embedding backfill")
+        in_flight = {}
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # Stored chunks leave the `embedding IS NULL` set, so the id
+            # cursor only keeps this run from picking up in-flight or
+            # failed chunks again
+            cursor = ""
+            exhausted = False
+            while not exhausted or in_flight:
+                # Keep the pool busy without reading the whole table at once
+                if not exhausted and len(in_flight) < self.workers * 2:
+                    chunks = ChunkManager.get_chunks_to_embed(cursor, PAGE_SIZE)
+                    if not chunks:
+                        exhausted = True
+                    else:
+                        cursor = chunks[-1]["id"]
+                        for batch in batch_by_tokens(chunks):
+                            future = executor.submit(self.embed_batch, batch)
+                            in_flight[future] = batch
+                        continue
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch = in_flight.pop(future)
+                    try:
+                        add_to_vector_index(future.result())
+                        self.embedded += len(batch)
+                    except Exception as e:
+                        self.failed += len(batch)
+                        logger.error(f"Batch of {len(batch)} chunks failed: {e}")
+
+                elapsed = time.monotonic() - started
+                logger.info(
+                    f"Embedded {self.embedded} chunks "
+                    f"({self.embedded / max(elapsed, 1e-9):.1f}/s), {self.failed} failed"
+                )
+
+        logger.info(
+            f"Backfill finished: {self.embedded} embedded, {self.failed} failed"
+        )
+
+
+def backfill_embeddings() -> None:
+    """Embed every chunk that has no embedding yet."""
+    EmbeddingBackfill().run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    backfill_embeddings()
@@ -0,0 +1,123 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from helper.html_cleaner import clean_html, clean_html_soup
+
+# Building blocks of the rich-text descriptions the Giveth editor produces
+PARAGRAPHS = [
+    "Our mission is to bring <strong>clean water</strong> to rural communities in "
+    "<em>Kenya</em> &amp; <em>Uganda</em>.",
+    "Every donation funds wells, filters and training &mdash; 100% on-chain &amp; "
+    "transparent.",
+    "Follow our progress on <a href='https://twitter.com/example' target='_blank' "
+    "rel='noopener noreferrer'>Twitter</a> or read the "
+    '<a href="https://example.org/report.pdf">annual report</a>.',
+    "We&#39;ve planted 12,000 trees since 2021 &#127795; and counting&hellip;",
+    "<span style='color: rgb(0, 0, 0);'>Regenerative finance (ReFi) aligns "
+    "incentives between funders and builders.</span>",
+    "Join us on Discord:&nbsp;<a href='https://discord.gg/example'>discord.gg/example</a>",
+]
+BLOCKS = [
+    "<h2>{title}</h2>",
+    "<p>{paragraph}</p>",
+    "<p>{paragraph}<br>{paragraph}</p>",
+    "<ul><li>{paragraph}</li><li>{paragraph}</li><li>{paragraph}</li></ul>",
+    "<ol><li><p>{paragraph}</p></li><li><p>{paragraph}</p></li></ol>",
+    "<blockquote>{paragraph}</blockquote>",
+    "<p><img src='https://giveth.mypinata.cloud/ipfs/Qm{title}' alt='{title}'></p>",
+    "<iframe class='ql-video' frameborder='0' allowfullscreen='true' "
+    "src='https://www.youtube.com/embed/{title}'></iframe>",
+    "<p><br></p>",
+]
+TITLES = ["About us", "Impact", "Roadmap", "Team", "How funds are used", "FAQ"]
+
+
+def synthetic_descriptions(count: int, seed: int = 0):
+    """Random descriptions assembled from typical editor output."""
+    rng = random.Random(seed)
+    descriptions = []
+    for _ in range(count):
+        blocks = [
+            rng.choice(BLOCKS).format(
+                title=rng.choice(TITLES), paragraph=rng.choice(PARAGRAPHS)
+            )
+            for _ in range(rng.randint(4, 40))
+        ]
+        descriptions.append("".join(blocks))
+    return descriptions
+
+
+def postgres_descriptions(count: int):
+    """Raw HTML descriptions of listed projects from PostgreSQL."""
+    from database import PostgresConnector
+
+    query = """
+        SELECT description FROM public.project
+        WHERE listed = TRUE AND description IS NOT NULL
+        LIMIT %s
+    """
+    return [row[0] for row in PostgresConnector.stream_query(query, (count,))]
+
+
+def clean_html_batch(html_contents: List[str], processes: int) -> List[str]:
+    """Clean many HTML documents across a process pool, in input order."""
+    if processes == 1:
+        return [clean_html(content) for content in html_contents]
+
+    chunksize = max(1, len(html_contents) // (processes * 4))
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(clean_html, html_contents, chunksize=chunksize))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def benchmark(descriptions, processes: int):
+    size_mb = sum(len(d) for d in descriptions) / 1e6
+    print(f"Descriptions: {len(descriptions)} ({size_mb:.1f} MB of HTML)")
+
+    reference, soup_seconds = timed(lambda: [clean_html_soup(d) for d in descriptions])
+    fast, fast_seconds = timed(lambda: [clean_html(d) for d in descriptions])
+    batch, batch_seconds = timed(clean_html_batch, descriptions, processes)
+
+    mismatches = sum(r != f for r, f in zip(reference, fast))
+    mismatches += sum(r != b for r, b in zip(reference, batch))
+    print(f"Output mismatches against BeautifulSoup: {mismatches}")
+
+    print(f"{'cleaner':<22}{'seconds':>10}{'docs/s':>12}{'speedup':>10}")
+    for name, seconds in [
+        ("beautifulsoup", soup_seconds),
+        ("streaming", fast_seconds),
+        (f"batch/{processes}", batch_seconds),
+    ]:
+        print(
+            f"{name:<22}{seconds:>10.3f}{len(descriptions) / seconds:>12.1f}"
+            f"{soup_seconds / seconds:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Speed and output parity of the HTML cleaners"
+    )
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--postgres",
+        action="store_true",
+        help="use real project descriptions from PostgreSQL",
+    )
+    args = parser.parse_args()
+
+    if args.postgres:
+        descriptions = postgres_descriptions(args.count)
+    else:
+        descriptions = synthetic_descriptions(args.count)
+    benchmark(descriptions, args.processes)
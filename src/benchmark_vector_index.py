@@ -0,0 +1,60 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+
+from vector_store import EmbeddingMatrix, IVFIndex
+
+
+def benchmark(queries: int = 200, k: int = 20, nprobes=(1, 2, 4, 8, 16, 32, 64)):
+    """
+    Compare IVF search against exact search on the stored chunk embeddings.
+    Queries are stored embeddings with a little noise added, so they look
+    like real chunk-sized queries without calling the embeddings API.
+    """
+    # Build the exact matrix in a scratch directory: the production matrix
+    # may be memory-mapped by a running server
+    with tempfile.TemporaryDirectory() as scratch:
+        exact = EmbeddingMatrix.build(directory=Path(scratch))
+        ivf = IVFIndex.build()
+        print(f"Corpus: {len(exact)} chunks, IVF lists: {ivf.nlist}")
+
+        rng = np.random.default_rng(0)
+        picks = rng.choice(len(exact), min(queries, len(exact)), replace=False)
+        noise = rng.normal(0, 0.01, (len(picks), exact.embeddings.shape[1]))
+        query_vectors = (np.asarray(exact.embeddings[picks]) + noise).astype(
+            np.float32
+        )
+
+        start = time.perf_counter()
+        truth = [
+            {chunk_id for chunk_id, _, _ in exact.search(q, k)}
+            for q in query_vectors
+        ]
+        exact_ms = (time.perf_counter() - start) * 1000 / len(query_vectors)
+        print(f"{'backend':<12}{'recall@' + str(k):>12}{'ms/query':>12}")
+        print(f"{'exact':<12}{1.0:>12.3f}{exact_ms:>12.3f}")
+
+        for nprobe in nprobes:
+            if nprobe > ivf.nlist:
+                break
+            start = time.perf_counter()
+            found = [
+                {chunk_id for chunk_id, _, _ in ivf.search(q, k, nprobe=nprobe)}
+                for q in query_vectors
+            ]
+            ivf_ms = (time.perf_counter() - start) * 1000 / len(query_vectors)
+            recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+            print(f"{'ivf/' + str(nprobe):<12}{recall:>12.3f}{ivf_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recall and latency of the IVF index versus exact search"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    benchmark(args.queries, args.k)
@@ -11,6 +11,15 @@ DB_USER = os.getenv("DB_USER", "your_user")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "your_password")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
+# Rows fetched per round trip by streaming (server-side cursor) queries
+POSTGRES_ITERSIZE = int(os.getenv("POSTGRES_ITERSIZE", "2000"))
+# Rows written to SQLite per transaction when syncing from Postgres
+SYNC_BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", "1000"))
+# SQLite page cache per connection, in KiB
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+# Prepared statements kept per SQLite connection
+SQLITE_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
+
 # OpenAI API Key
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
@@ -18,3 +27,67 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "your_password")
+
+# Neo4j connection pool (shared by every driver user in the process)
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+NEO4J_MAX_CONNECTION_LIFETIME = float(
+    os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600")
+)
+
+# Neo4j import: rows per UNWIND transaction, parallel write sessions, and
+# retries of a failed batch
+NEO4J_IMPORT_BATCH_SIZE = int(os.getenv("NEO4J_IMPORT_BATCH_SIZE", "1000"))
+NEO4J_IMPORT_CHUNK_BATCH_SIZE = int(os.getenv("NEO4J_IMPORT_CHUNK_BATCH_SIZE", "200"))
+NEO4J_IMPORT_WORKERS = int(os.getenv("NEO4J_IMPORT_WORKERS", "4"))
+NEO4J_IMPORT_RETRIES = int(os.getenv("NEO4J_IMPORT_RETRIES", "3"))
+
+# API key authentication cache
+API_KEY_CACHE_REFRESH_SECONDS = float(os.getenv("API_KEY_CACHE_REFRESH_SECONDS", "60"))
+API_KEY_CACHE_POLL_SECONDS = float(os.getenv("API_KEY_CACHE_POLL_SECONDS", "2"))
+
+# API key usage logging
+API_USAGE_BATCH_SIZE = int(os.getenv("API_USAGE_BATCH_SIZE", "200"))
+API_USAGE_FLUSH_SECONDS = float(os.getenv("API_USAGE_FLUSH_SECONDS", "1"))
+API_USAGE_QUEUE_SIZE = int(os.getenv("API_USAGE_QUEUE_SIZE", "10000"))
+
+# Query processing
+CYPHER_PLANNER = os.getenv("CYPHER_PLANNER", "false").lower() == "true"
+
+# Generated Cypher cache
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "5000"))
+QUERY_CACHE_SIMILARITY = float(os.getenv("QUERY_CACHE_SIMILARITY", "0.95"))
+
+# Chunk vector search
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1536"))
+VECTOR_SEARCH_TOP_K = int(os.getenv("VECTOR_SEARCH_TOP_K", "100"))
+# Minimum cosine similarity the generated queries start from
+SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.7"))
+# "neo4j" (vector index), "numpy" (exact, memory-mapped) or "ivf" (approximate)
+VECTOR_SEARCH_BACKEND = os.getenv("VECTOR_SEARCH_BACKEND", "neo4j")
+IVF_NLIST = int(os.getenv("IVF_NLIST", "0"))  # 0 picks ~sqrt(number of chunks)
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+# Fold added and deleted chunks into the IVF lists once they exceed this
+# share of the indexed chunks
+IVF_COMPACT_FRACTION = float(os.getenv("IVF_COMPACT_FRACTION", "0.2"))
+
+# Embedding requests
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "100000"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "1024"))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+# Embedding backfill job
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "4"))
+EMBEDDING_RPM = int(os.getenv("EMBEDDING_RPM", "3000"))
+EMBEDDING_TPM = int(os.getenv("EMBEDDING_TPM", "1000000"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "6"))
+
+# Staged ingestion pipeline (src/pipeline.py)
+PIPELINE_BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", "200"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+PIPELINE_PROCESSES = int(os.getenv("PIPELINE_PROCESSES", str(os.cpu_count() or 2)))
+PIPELINE_REPORT_SECONDS = float(os.getenv("PIPELINE_REPORT_SECONDS", "10"))
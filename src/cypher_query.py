@@ -1,16 +1,94 @@
 import re
 import json
-from typing import Dict, Any, List, Optional
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from utils.openai import generate_embedding, openai_client
-from neo4j_utils import Neo4jImporter
+from neo4j_utils import get_driver, CHUNK_VECTOR_INDEX
+from config.config import SIMILARITY_THRESHOLD, VECTOR_SEARCH_TOP_K
+from query_cache import CypherCache
+
+logger = logging.getLogger("cypher_query")
+
+# Shared by all processors. A concurrent semantic request holds one worker
+# for its embedding, so 16 workers serve 16 such requests before they queue.
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="cypher-query")
+
+# Structured output returned by the single-call planner
+PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "embedding_needed": {"type": "boolean"},
+        "embedding_message": {"type": "string"},
+        "cypher_query": {"type": "string"},
+    },
+    "required": ["embedding_needed", "embedding_message", "cypher_query"],
+    "additionalProperties": False,
+}
+
+
+# A JSON string, or a Python literal outside of one
+_STRING_OR_LITERAL = re.compile(r'"(?:\\.|[^"\\])*"|\b(True|False|None)\b')
+_JSON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def parse_json_response(text: str) -> Dict[str, Any]:
+    """
+    Parse a JSON object from an LLM response, tolerating markdown code
+    fences, surrounding prose and Python-style True/False/None literals.
+    """
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    fenced = re.search(r"```(?:json)?\s*(.*?)\s*```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        text = text[start : end + 1]
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        text = _STRING_OR_LITERAL.sub(
+            lambda m: _JSON_LITERALS[m.group(1)] if m.group(1) else m.group(0), text
+        )
+        return json.loads(text)
 
 
 class CypherQueryProcessor:
     """Class for handling Neo4j query generation using LLM assistance."""
 
-    def __init__(self, schema_hint: str):
-        """Initialize with the database schema information."""
+    def __init__(
+        self,
+        schema_hint: str,
+        concurrent: bool = True,
+        planner: bool = False,
+        cache: Optional[CypherCache] = None,
+        vector_index=None,
+    ):
+        """
+        Initialize with the database schema information.
+        When `concurrent` is set, the query embedding and the Cypher query
+        are generated in parallel, since the prompt only needs the
+        embedding message and not the vector itself.
+        When `planner` is set, the embedding decision and the Cypher query
+        come from a single structured LLM call instead of two.
+        When a `cache` is given, previously generated plans are reused;
+        with `planner` only identical requests hit it (see CypherCache).
+        When a local `vector_index` (see vector_store) is given, the nearest
+        chunks are looked up in it and passed to the query as $chunkMatches
+        instead of being searched in Neo4j.
+        """
         self.schema_hint = schema_hint
+        self.concurrent = concurrent
+        self.planner = planner
+        self.cache = cache
+        self.vector_index = vector_index
 
     def process_user_request(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -21,31 +99,103 @@ class CypherQueryProcessor:
         4. Returns query results.
         """
 
-        # Check if semantic search is needed
-        embedding_info = self._check_embedding_requirement(request)
-        print(f"Embedding Check: {embedding_info}")
+        cached = self.cache.get(request) if self.cache else None
+        if cached:
+            logger.debug(f"Cached plan: {cached}")
+            embedding_message = cached["embedding_message"]
+            cypher_query: str = cached["cypher_query"]
+            embedding = (
+                generate_embedding(embedding_message) if embedding_message else None
+            )
+        elif self.planner:
+            plan = self._plan_query(request)
+            logger.debug(f"Query plan: {plan}")
+            embedding_message = (
+                plan["embedding_message"] if plan["embedding_needed"] else None
+            )
+            cypher_query: str = plan["cypher_query"]
+            embedding = (
+                generate_embedding(embedding_message) if embedding_message else None
+            )
+        else:
+            cypher_query, embedding_message, embedding = self._generate_in_steps(
+                request
+            )
 
-        # Generate embedding if needed
-        embedding, embedding_message = None, None
-        if embedding_info["embedding_needed"]:
-            embedding_message = embedding_info["embedding_message"]
-            embedding = generate_embedding(embedding_message)
+        if embedding:
             print(
                 f"Generated embedding for: '{embedding_message}' (first 5 values: {embedding[:5]}...)"
             )
-
-        # Generate Cypher query
-        cypher_query: str = self._generate_cypher_query(
-            request, embedding_message, embedding
-        )
         print(f"Generated Cypher Query: {cypher_query}")
 
         # Execute query with parameters
         parameters = {"queryVector": embedding} if embedding else {}
+        if embedding and self.vector_index is not None:
+            parameters["chunkMatches"] = [
+                {"chunk_id": chunk_id, "similarity": similarity}
+                for chunk_id, _, similarity in self.vector_index.search(
+                    embedding, VECTOR_SEARCH_TOP_K
+                )
+            ]
         results = self._execute_query(cypher_query, parameters)
 
+        # Only plans that ran successfully are worth reusing
+        if self.cache and not cached:
+            self.cache.put(request, cypher_query, embedding_message, embedding)
+
         return results
 
+    def _generate_in_steps(
+        self, request: Dict[str, Any]
+    ) -> Tuple[str, Optional[str], Optional[List[float]]]:
+        """
+        Two-call workflow: check whether an embedding is needed, then generate
+        the Cypher query (overlapping it with the embedding when concurrent),
+        unless the cache holds a semantically equivalent plan. Generation
+        only overlaps the embedding when the cache has no plan of the same
+        template, so a semantic hit never pays for a generation.
+        Returns the query, the embedding message and the embedding.
+        """
+        # Check if semantic search is needed
+        embedding_info = self._check_embedding_requirement(request)
+        print(f"Embedding Check: {embedding_info}")
+
+        embedding, embedding_message = None, None
+        if embedding_info.get("embedding_needed"):
+            embedding_message = embedding_info.get("embedding_message")
+
+        if embedding_message and self.concurrent:
+            # Embed on a worker while the Cypher query is generated
+            embedding_future = _executor.submit(generate_embedding, embedding_message)
+            if self.cache and self.cache.has_candidates(request, embedding_message):
+                # A semantic hit is possible: wait for the embedding instead
+                # of paying for a generation the hit would discard
+                embedding = embedding_future.result()
+                similar = self.cache.find_similar(request, embedding_message, embedding)
+                if similar:
+                    return similar["cypher_query"], embedding_message, embedding
+            cypher_query = self._generate_cypher_query(request, embedding_message)
+            if embedding is None:
+                embedding = embedding_future.result()
+        else:
+            # Generate embedding if needed
+            if embedding_message:
+                embedding = generate_embedding(embedding_message)
+                similar = (
+                    self.cache.find_similar(request, embedding_message, embedding)
+                    if self.cache
+                    else None
+                )
+                if similar:
+                    return similar["cypher_query"], embedding_message, embedding
+
+            # Generate Cypher query
+            cypher_query = self._generate_cypher_query(
+                request, embedding_message, embedding
+            )
+
+        return cypher_query, embedding_message, embedding
+
     def _check_embedding_requirement(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """
         Determine if semantic search (embedding) is needed for the query.
@@ -92,24 +242,77 @@ class CypherQueryProcessor:
             ],
             max_tokens=100,
             temperature=0.3,
+            response_format={"type": "json_object"},
         )
 
         result: str = response.choices[0].message.content.strip()
+        embedding_info = parse_json_response(result)
 
-        # Ensure proper JSON formatting
-        result_clean = (
-            result.strip("`")
-            .replace("json", "")
-            .replace("```", "")
-            .strip()
-            .replace("True", "true")
-            .replace("False", "false")
+        return embedding_info
+
+    def _plan_query(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Decide on semantic search and generate the Cypher query in one call.
+        Returns a dict with embedding_needed, embedding_message and
+        cypher_query; semantic queries reference $queryVector.
+        """
+        logger.debug(f"Planning request: {request}")
+
+        prompt = f"""
+        Database Schema:
+        {self.schema_hint}
+
+        Search Request:
+        - Query: "{request['query']}"
+        - Output Format: {request['output_format']}
+
+        STEP 1 - Decide whether semantic search is needed.
+        Semantic search means looking for project chunks with a similar meaning to the query.
+        If it is needed, set "embedding_needed" to true and write a concise "embedding_message"
+        to embed. For example, for "provide me 2 projects related to climate change impact on
+        renewable energy" the embedding message is "climate change impact on renewable energy".
+        If the intention is to find random projects or random donations, set "embedding_needed"
+        to false and "embedding_message" to an empty string.
+
+        STEP 2 - Write the Cypher query in "cypher_query".
+        If semantic search is needed, follow these requirements:
+        {self._semantic_requirements("the embedding_message from STEP 1")}
+        Otherwise, follow these requirements:
+        {self._direct_requirements()}
+
+        The "cypher_query" value must be the raw Cypher query only, without markdown or commentary.
+        """
+
+        response = openai_client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert Cypher query generator.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=600,
+            temperature=0.1,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "query_plan",
+                    "strict": True,
+                    "schema": PLAN_SCHEMA,
+                },
+            },
         )
-        print(f"Cleaned result: {result_clean}")
 
-        embedding_info = json.loads(result_clean)
+        plan = parse_json_response(response.choices[0].message.content)
+        plan["embedding_needed"] = bool(plan.get("embedding_needed"))
+        plan["embedding_message"] = plan.get("embedding_message") or None
+        if plan["embedding_needed"] and not plan["embedding_message"]:
+            # Nothing to embed, so the query cannot bind $queryVector
+            plan["embedding_needed"] = False
+        plan["cypher_query"] = self._clean_cypher(plan.get("cypher_query", ""))
 
-        return embedding_info
+        return plan
 
     def _generate_cypher_query(
         self,
@@ -119,7 +322,8 @@ class CypherQueryProcessor:
     ) -> str:
         """
         Generates a Cypher query for Neo4j based on the user's request.
-        Uses embedding for semantic similarity search if available.
+        Uses semantic similarity search when an embedding message is given;
+        the vector itself is only bound as $queryVector at execution time.
         """
         prompt = f"""
         Database Schema:
@@ -130,18 +334,68 @@ class CypherQueryProcessor:
         - Output Format: {request['output_format']}
         """
 
-        if embedding:
-            prompt += f"""
+        if embedding_message:
+            prompt += self._semantic_requirements(f'"{embedding_message}"')
+        else:
+            prompt += self._direct_requirements()
+
+        prompt += """
+        
+        IMPORTANT: Return ONLY the Cypher query without ANY explanation, commentary, or markdown formatting. 
+        The output should begin directly with a Cypher keyword like MATCH, WITH, or CALL.
+        DO NOT include any headings, code blocks, or other text - JUST the raw Cypher query.
+        """
+
+        print(f"Generated Prompt: {prompt}")
+
+        response = openai_client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert Cypher query generator.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=500,
+            temperature=0.1,
+        )
+
+        cypher_query: str = response.choices[0].message.content
+
+        return self._clean_cypher(cypher_query)
+
+    def _semantic_requirements(self, embedding_message: str) -> str:
+        """Prompt section describing how to write a vector search query."""
+        if self.vector_index is not None:
+            # Nearest chunks are found locally and passed in as $chunkMatches
+            pattern = f"""
+        UNWIND $chunkMatches AS chunk_match
+        MATCH (p:Project)-[:HAS_CHUNK]->(c:Chunk {{id: chunk_match.chunk_id}})
+        WITH p, c, chunk_match.similarity AS similarity
+        WHERE similarity > {SIMILARITY_THRESHOLD}"""
+            search_rules = """
+        - $chunkMatches holds the nearest chunks as {chunk_id, similarity} maps; start from it
+        - Never compute similarity over Chunk nodes yourself"""
+        else:
+            pattern = f"""
+        CALL db.index.vector.queryNodes('{CHUNK_VECTOR_INDEX}', {VECTOR_SEARCH_TOP_K}, $queryVector)
+        YIELD node AS c, score
+        WITH c, 2 * score - 1 AS similarity
+        WHERE similarity > {SIMILARITY_THRESHOLD}
+        MATCH (p:Project)-[:HAS_CHUNK]->(c)"""
+            search_rules = f"""
+        - Keep the db.index.vector.queryNodes call; never compute similarity over all Chunk nodes
+        - `2 * score - 1` converts the index score back to cosine similarity; keep it
+        - Raise the number of nearest chunks ({VECTOR_SEARCH_TOP_K}) if many projects are requested"""
+
+        return f"""
         SEMANTIC SEARCH REQUIREMENTS:
         
         You must use semantic vector search with these exact requirements:
         
         1. Base your query on this pattern:
-        ```
-        MATCH (p:Project)-[:HAS_CHUNK]->(c:Chunk)
-        WHERE c.embedding IS NOT NULL
-        WITH p, c, gds.similarity.cosine(c.embedding, $queryVector) AS similarity
-        WHERE similarity > {0.7}
+        ```{pattern}
         WITH p, c, similarity
         ORDER BY similarity DESC
         WITH p, collect({{text: c.text, similarity: similarity}}) AS chunk_matches
@@ -150,10 +404,10 @@ class CypherQueryProcessor:
         WHERE p.listed = true
         ```
         
-        2. $queryVector will contain the embedding for: "{embedding_message}"
+        2. $queryVector will contain the embedding for: {embedding_message}
         
         3. Additional instructions:
-        - NO text-based matching (CONTAINS, regex) as primary filtering
+        - NO text-based matching (CONTAINS, regex) as primary filtering{search_rules}
         - Adjust similarity threshold (0.7-0.85) based on query specificity
         - Always include `p.listed = true`
         - For topic queries like "kids health", add secondary filters after semantic match if needed
@@ -161,8 +415,10 @@ class CypherQueryProcessor:
         - Add LIMIT 20 unless otherwise specified
         - Order by similarity first, then by relevance indicators
         """
-        else:
-            prompt += """
+
+    def _direct_requirements(self) -> str:
+        """Prompt section describing how to write a property-match query."""
+        return """
         DIRECT PROPERTY MATCHING REQUIREMENTS:
         
         Use direct property matches:
@@ -180,29 +436,9 @@ class CypherQueryProcessor:
         - Add LIMIT 20 unless otherwise specified
         """
 
-        prompt += """
-        
-        IMPORTANT: Return ONLY the Cypher query without ANY explanation, commentary, or markdown formatting. 
-        The output should begin directly with a Cypher keyword like MATCH, WITH, or CALL.
-        DO NOT include any headings, code blocks, or other text - JUST the raw Cypher query.
-        """
-
-        print(f"Generated Prompt: {prompt}")
-
-        response = openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert Cypher query generator.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=500,
-            temperature=0.1,
-        )
-
-        cypher_query: str = response.choices[0].message.content.strip()
+    def _clean_cypher(self, cypher_query: str) -> str:
+        """Strip markdown fences and update deprecated function names."""
+        cypher_query = cypher_query.strip()
 
         # Remove any backticks or code block markers
         cypher_query = re.sub(r"^```cypher\s*", "", cypher_query)
@@ -232,11 +468,9 @@ class CypherQueryProcessor:
         """
         Execute a Cypher query against Neo4j.
         """
-        importer = Neo4jImporter()
-        with importer.get_driver() as driver:
-            with driver.session() as session:
-                result = session.run(cypher_query, parameters=parameters)
-                return [record.data() for record in result]
+        with get_driver().session() as session:
+            result = session.run(cypher_query, parameters=parameters)
+            return [record.data() for record in result]
 
 
 schema_hint = """
@@ -1,15 +1,30 @@
 import numpy as np
 import sqlite3
-import ast
 import os
 import json
+import struct
 import logging
-from typing import Dict, List, Any, Optional, Union, Tuple
+import uuid
+import threading
+from contextlib import contextmanager
+from typing import (
+    Dict, List, Any, Callable, Iterable, Iterator, Optional, Set, Union, Tuple
+)
 from datetime import datetime
 import psycopg2
 from pathlib import Path
 
-from config.config import DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT
+from config.config import (
+    DB_HOST,
+    DB_NAME,
+    DB_USER,
+    DB_PASSWORD,
+    DB_PORT,
+    POSTGRES_ITERSIZE,
+    SYNC_BATCH_SIZE,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_CACHED_STATEMENTS,
+)
 from helper.html_cleaner import clean_html
 from helper.project_data_parser import extract_flat_project_data
 
@@ -21,13 +36,140 @@ logger = logging.getLogger("database")
 
 # Constants
 DATA_DIR = Path("data")
-PROJECT_CACHE_FILE = DATA_DIR / "projects_cache.json"
-DONATION_CACHE_FILE = DATA_DIR / "donations_cache.json"
 DB_PATH = DATA_DIR / "local_data.db"
 
 # Ensure data directory exists
 DATA_DIR.mkdir(exist_ok=True)
 
+# Per-thread SQLite connection and transaction depth
+_local = threading.local()
+
+# Column order expected by ProjectManager._project_from_row
+PROJECT_COLUMNS = """
+    id, title, raised_amount, giv_power, giv_power_rank, listed, 
+    updated_at, givbacks_eligible, description, in_active_qf_round, 
+    unique_donors, owner_wallet, polygon_address, celo_address, 
+    base_address, solana_address, ethereum_address, arbitrum_address, 
+    optimism_address, gnosis_address, stellar_address, zkevm_address, 
+    ethereum_classic_address, x, discord, telegram, instagram, facebook, 
+    github, linkedin, website, farcaster, youtube, reddit, lens 
+"""
+
+# Chunk ids include their project, so two projects may share a text
+CHUNKS_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id TEXT PRIMARY KEY,
+        project_id INTEGER,
+        text TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        embedding BLOB,
+        FOREIGN KEY (project_id) REFERENCES projects(id)
+    )
+"""
+
+PROJECT_UPSERT_QUERY = """
+    INSERT INTO projects (
+        id, title, description, raised_amount, giv_power, giv_power_rank, listed, 
+        givbacks_eligible, in_active_qf_round, unique_donors, owner_wallet, 
+        polygon_address, celo_address, base_address, solana_address, 
+        ethereum_address, arbitrum_address, optimism_address, gnosis_address, 
+        stellar_address, zkevm_address, ethereum_classic_address, x, 
+        discord, telegram, instagram, facebook, github, linkedin, website, 
+        farcaster, youtube, reddit, lens, description_hash, updated_at
+    )
+    VALUES (
+        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 
+        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+    )
+    ON CONFLICT(id) DO UPDATE SET
+        title = excluded.title,
+        raised_amount = excluded.raised_amount,
+        giv_power = excluded.giv_power,
+        giv_power_rank = excluded.giv_power_rank,
+        listed = excluded.listed,
+        description = excluded.description,
+        givbacks_eligible = excluded.givbacks_eligible,
+        in_active_qf_round = excluded.in_active_qf_round,
+        unique_donors = excluded.unique_donors,
+        owner_wallet = excluded.owner_wallet,
+        polygon_address = excluded.polygon_address,
+        celo_address = excluded.celo_address,
+        base_address = excluded.base_address,
+        solana_address = excluded.solana_address,
+        ethereum_address = excluded.ethereum_address,
+        arbitrum_address = excluded.arbitrum_address,
+        optimism_address = excluded.optimism_address,
+        gnosis_address = excluded.gnosis_address,
+        stellar_address = excluded.stellar_address,
+        zkevm_address = excluded.zkevm_address,
+        ethereum_classic_address = excluded.ethereum_classic_address,
+        x = excluded.x,
+        discord = excluded.discord,
+        telegram = excluded.telegram,
+        instagram = excluded.instagram,
+        facebook = excluded.facebook,
+        github = excluded.github,
+        linkedin = excluded.linkedin,
+        website = excluded.website,
+        farcaster = excluded.farcaster,
+        youtube = excluded.youtube,
+        reddit = excluded.reddit,
+        lens = excluded.lens,
+        description_hash = excluded.description_hash,
+        updated_at = excluded.updated_at
+"""
+
+DONATION_COLUMNS = """
+    id, project_id, tx_hash, to_address, from_address, currency,
+    anonymous, amount, value_usd, created_at, chain_id, token_address, chain_type
+"""
+
+DONATION_INSERT_QUERY = """
+    INSERT INTO donations (
+        id, project_id, tx_hash, to_address, from_address, currency, 
+        anonymous, amount, value_usd, created_at, chain_id, token_address, chain_type
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO NOTHING
+"""
+
+# Binary embedding format stored in chunks.embedding: an 8-byte header
+# (magic, format version, dimensions) followed by little-endian float32s
+EMBEDDING_MAGIC = b"EMB"
+EMBEDDING_FORMAT_VERSION = 1
+EMBEDDING_HEADER = struct.Struct("<3sBI")
+
+
+def encode_embedding(embedding: Union[List[float], np.ndarray]) -> bytes:
+    """Serialize an embedding into the versioned float32 BLOB format."""
+    values = np.asarray(embedding, dtype="<f4")
+    header = EMBEDDING_HEADER.pack(
+        EMBEDDING_MAGIC, EMBEDDING_FORMAT_VERSION, values.shape[0]
+    )
+    return header + values.tobytes()
+
+
+def decode_embedding(blob: Union[bytes, str, None]) -> Optional[np.ndarray]:
+    """
+    Deserialize a stored embedding into a read-only float32 array.
+    Versioned BLOBs are read without copying; legacy JSON text and
+    headerless float32 BLOBs are still understood.
+    """
+    if blob is None:
+        return None
+    if isinstance(blob, str):
+        return np.asarray(json.loads(blob), dtype=np.float32)
+    if blob[:3] == EMBEDDING_MAGIC:
+        _, version, dimensions = EMBEDDING_HEADER.unpack_from(blob)
+        if version != EMBEDDING_FORMAT_VERSION:
+            raise ValueError(f"Unsupported embedding format version {version}")
+        return np.frombuffer(
+            blob, dtype="<f4", count=dimensions, offset=EMBEDDING_HEADER.size
+        )
+    if blob[:1] == b"[":
+        return np.asarray(json.loads(blob), dtype=np.float32)
+    return np.frombuffer(blob, dtype=np.float32)
+
 
 class PostgresConnector:
     """Handles connections and queries to PostgreSQL database."""
@@ -65,59 +207,162 @@ class PostgresConnector:
             cursor.close()
             connection.close()
 
+    @staticmethod
+    def stream_query(
+        query: str, params: tuple = None, itersize: int = POSTGRES_ITERSIZE
+    ) -> Iterator[tuple]:
+        """
+        Execute a query on a named server-side cursor and yield its rows.
+        Rows are fetched `itersize` at a time, so memory stays bounded
+        however large the result set is.
+        """
+        connection = PostgresConnector.get_connection()
+        cursor = connection.cursor(name=f"stream_{uuid.uuid4().hex}")
+        cursor.itersize = itersize
+
+        try:
+            cursor.execute(query, params or ())
+            yield from cursor
+        except psycopg2.Error as e:
+            logger.error(f"Query execution error: {e}")
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
 
 class SQLiteConnector:
-    """Handles connections and operations for SQLite database."""
+    """
+    Handles connections and operations for SQLite database.
+
+    Each thread reuses a single connection, opened on first use, so calls
+    from the Flask server's threads and from ingestion workers never share
+    one. Statements run inside `transaction()` commit together.
+    """
 
     @staticmethod
-    def get_connection():
-        """Create and return an SQLite database connection."""
+    def connect() -> sqlite3.Connection:
+        """Open a new, tuned SQLite connection."""
         try:
-            return sqlite3.connect(DB_PATH)
+            connection = sqlite3.connect(
+                DB_PATH, cached_statements=SQLITE_CACHED_STATEMENTS
+            )
+            SQLiteConnector.configure(connection)
+            return connection
         except sqlite3.Error as e:
             logger.error(f"SQLite connection error: {e}")
             raise
 
+    @staticmethod
+    def get_connection() -> sqlite3.Connection:
+        """
+        Return the calling thread's SQLite connection, opening it on first
+        use. The connection is reused by later calls, so do not close it.
+        """
+        connection = getattr(_local, "connection", None)
+        if connection is None:
+            connection = SQLiteConnector.connect()
+            _local.connection = connection
+            _local.depth = 0
+        return connection
+
+    @staticmethod
+    def close_connection() -> None:
+        """Close the calling thread's connection, if it has one."""
+        connection = getattr(_local, "connection", None)
+        if connection is not None:
+            connection.close()
+            _local.connection = None
+
+    @staticmethod
+    @contextmanager
+    def transaction() -> Iterator[sqlite3.Connection]:
+        """
+        Group statements on the thread's connection into one transaction,
+        committed on exit or rolled back on error. Nested scopes join the
+        outermost one.
+        """
+        connection = SQLiteConnector.get_connection()
+        _local.depth += 1
+        try:
+            yield connection
+        except BaseException:
+            _local.depth -= 1
+            if _local.depth == 0:
+                connection.rollback()
+            raise
+        _local.depth -= 1
+        if _local.depth == 0:
+            connection.commit()
+
+    @staticmethod
+    def configure(connection: sqlite3.Connection) -> None:
+        """
+        Tune a connection for bulk writes. WAL lets readers run alongside
+        a writer, and with synchronous=NORMAL a commit appends to the WAL
+        without an fsync (still durable across application crashes).
+        """
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)}")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        # Wait for other writers instead of failing with "database is locked"
+        connection.execute("PRAGMA busy_timeout=30000")
+
     @staticmethod
     def execute_query(
         query: str, params: tuple = None, fetch: bool = True
     ) -> Optional[List[tuple]]:
         """Execute a query and optionally return results."""
+        with SQLiteConnector.transaction() as connection:
+            cursor = connection.cursor()
+
+            try:
+                cursor.execute(query, params or ())
+                return cursor.fetchall() if fetch else None
+            except sqlite3.Error as e:
+                logger.error(f"Query execution error: {e}")
+                raise
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def iter_batches(
+        query: str, params: tuple = None, batch_size: int = SYNC_BATCH_SIZE
+    ) -> Iterator[List[tuple]]:
+        """
+        Yield the rows of a query in lists of up to `batch_size`, reading
+        them from the cursor as they are consumed rather than all at once.
+        """
         connection = SQLiteConnector.get_connection()
         cursor = connection.cursor()
 
         try:
             cursor.execute(query, params or ())
-
-            if fetch:
-                return cursor.fetchall()
-            else:
-                connection.commit()
-                return None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
         except sqlite3.Error as e:
             logger.error(f"Query execution error: {e}")
-            connection.rollback()
             raise
         finally:
             cursor.close()
-            connection.close()
 
     @staticmethod
     def execute_many(query: str, params_list: List[tuple]) -> None:
         """Execute multiple similar queries with different parameters."""
-        connection = SQLiteConnector.get_connection()
-        cursor = connection.cursor()
+        with SQLiteConnector.transaction() as connection:
+            cursor = connection.cursor()
 
-        try:
-            cursor.executemany(query, params_list)
-            connection.commit()
-        except sqlite3.Error as e:
-            logger.error(f"Batch execution error: {e}")
-            connection.rollback()
-            raise
-        finally:
-            cursor.close()
-            connection.close()
+            try:
+                cursor.executemany(query, params_list)
+            except sqlite3.Error as e:
+                logger.error(f"Batch execution error: {e}")
+                raise
+            finally:
+                cursor.close()
 
 
 class DatabaseInitializer:
@@ -171,24 +416,14 @@ class DatabaseInitializer:
                     reddit TEXT,
                     lens TEXT,
 
+                    description_hash TEXT,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """
             )
 
             # Chunks table
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS chunks (
-                    id TEXT PRIMARY KEY,
-                    project_id INTEGER,
-                    text TEXT UNIQUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    embedding BLOB,
-                    FOREIGN KEY (project_id) REFERENCES projects(id)
-                )
-            """
-            )
+            cursor.execute(CHUNKS_TABLE_QUERY.format(table="chunks"))
 
             # Donations table
             cursor.execute(
@@ -212,6 +447,170 @@ class DatabaseInitializer:
             """
             )
 
+            # Chunk replacement and the Neo4j import look chunks and
+            # donations up, and read them in order, by project
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chunks_project_id "
+                "ON chunks(project_id)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_donations_project_id "
+                "ON donations(project_id)"
+            )
+            # Covers only chunks still waiting for an embedding
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chunks_unembedded "
+                "ON chunks(id) WHERE embedding IS NULL"
+            )
+
+            # High-water marks for incremental syncs, one row per source table
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    table_name TEXT PRIMARY KEY,
+                    watermark TEXT,
+                    synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """
+            )
+
+            # Graph nodes to delete on the next Neo4j import: deleted chunks,
+            # donations and projects, and projects that were delisted
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tombstones (
+                    label TEXT NOT NULL,
+                    node_id TEXT NOT NULL,
+                    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (label, node_id)
+                )
+            """
+            )
+            for table, label in [
+                ("chunks", "Chunk"),
+                ("projects", "Project"),
+                ("donations", "Donation"),
+            ]:
+                cursor.execute(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_tombstone
+                    AFTER DELETE ON {table}
+                    BEGIN
+                        INSERT OR REPLACE INTO tombstones (label, node_id)
+                        VALUES ('{label}', old.id);
+                    END
+                """
+                )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS projects_delisted_tombstone
+                AFTER UPDATE OF listed ON projects
+                WHEN old.listed AND NOT new.listed
+                BEGIN
+                    INSERT OR REPLACE INTO tombstones (label, node_id)
+                    VALUES ('Project', new.id);
+                END
+            """
+            )
+            # A project listed again before the import saw it stays in Neo4j
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS projects_relisted_tombstone
+                AFTER UPDATE OF listed ON projects
+                WHEN new.listed AND NOT old.listed
+                BEGIN
+                    DELETE FROM tombstones
+                    WHERE label = 'Project' AND node_id = new.id;
+                END
+            """
+            )
+
+            # The last local change to each row Neo4j mirrors, numbered in
+            # write order, so the Neo4j import can read everything changed
+            # after the last number it saw. node_id has no type, so ids
+            # keep theirs and compare equal to the rows they point at.
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS change_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    label TEXT NOT NULL,
+                    node_id NOT NULL,
+                    UNIQUE (label, node_id)
+                )
+            """
+            )
+            # Logging a row again moves it to the next seq. The old entry is
+            # deleted rather than replaced: an upsert's conflict clause would
+            # override OR REPLACE inside the trigger.
+            for table, label, columns in [
+                ("projects", "Project", PROJECT_COLUMNS),
+                ("chunks", "Chunk", "project_id, embedding"),
+                ("donations", "Donation", DONATION_COLUMNS),
+            ]:
+                changed = " OR ".join(
+                    f"old.{column} IS NOT new.{column}"
+                    for column in (c.strip() for c in columns.split(","))
+                )
+                cursor.execute(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_insert_change
+                    AFTER INSERT ON {table}
+                    BEGIN
+                        DELETE FROM change_log
+                        WHERE label = '{label}' AND node_id = new.id;
+                        INSERT INTO change_log (label, node_id)
+                        VALUES ('{label}', new.id);
+                    END
+                """
+                )
+                # Upserts rewrite unchanged rows, which Neo4j already has
+                cursor.execute(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_update_change
+                    AFTER UPDATE ON {table}
+                    WHEN {changed}
+                    BEGIN
+                        DELETE FROM change_log
+                        WHERE label = '{label}' AND node_id = new.id;
+                        INSERT INTO change_log (label, node_id)
+                        VALUES ('{label}', new.id);
+                    END
+                """
+                )
+                cursor.execute(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_delete_change
+                    AFTER DELETE ON {table}
+                    BEGIN
+                        DELETE FROM change_log
+                        WHERE label = '{label}' AND node_id = old.id;
+                    END
+                """
+                )
+            # Delisting removed the project's chunks and donations from
+            # Neo4j, so listing it again has to bring them back
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS projects_relisted_change
+                AFTER UPDATE OF listed ON projects
+                WHEN new.listed AND NOT old.listed
+                BEGIN
+                    DELETE FROM change_log
+                    WHERE label = 'Chunk' AND node_id IN (
+                        SELECT id FROM chunks WHERE project_id = new.id
+                    );
+                    INSERT INTO change_log (label, node_id)
+                    SELECT 'Chunk', id FROM chunks WHERE project_id = new.id;
+                    DELETE FROM change_log
+                    WHERE label = 'Donation' AND node_id IN (
+                        SELECT id FROM donations WHERE project_id = new.id
+                    );
+                    INSERT INTO change_log (label, node_id)
+                    SELECT 'Donation', id FROM donations WHERE project_id = new.id;
+                END
+            """
+            )
+
             connection.commit()
             logger.info("Database schema initialized successfully")
 
@@ -221,23 +620,125 @@ class DatabaseInitializer:
             raise
         finally:
             cursor.close()
-            connection.close()
+
+    @staticmethod
+    def get_schema_version() -> int:
+        """Return the version recorded by data migrations (0 if none ran)."""
+        return SQLiteConnector.execute_query("PRAGMA user_version")[0][0]
+
+    @staticmethod
+    def set_schema_version(version: int) -> None:
+        """Record that the data migrations up to `version` have run."""
+        SQLiteConnector.execute_query(
+            f"PRAGMA user_version = {int(version)}", fetch=False
+        )
+
+    @staticmethod
+    def migrate_schema():
+        """Add columns introduced after a database was first created."""
+        columns = {
+            row[1]
+            for row in SQLiteConnector.execute_query("PRAGMA table_info(projects)")
+        }
+        if "description_hash" not in columns:
+            SQLiteConnector.execute_query(
+                "ALTER TABLE projects ADD COLUMN description_hash TEXT", fetch=False
+            )
+            logger.info("Added projects.description_hash column")
+
+
+class SyncStateManager:
+    """Stores the high-water marks used by incremental syncs."""
+
+    @staticmethod
+    def get_watermark(table_name: str) -> Optional[str]:
+        """Return the stored watermark for a source table, if any."""
+        results = SQLiteConnector.execute_query(
+            "SELECT watermark FROM sync_state WHERE table_name = ?", (table_name,)
+        )
+        return results[0][0] if results else None
+
+    @staticmethod
+    def set_watermark(table_name: str, watermark: Any) -> None:
+        """Record the watermark reached by the last successful sync."""
+        query = """
+            INSERT INTO sync_state (table_name, watermark, synced_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(table_name) DO UPDATE SET
+                watermark = excluded.watermark,
+                synced_at = excluded.synced_at
+        """
+        SQLiteConnector.execute_query(query, (table_name, str(watermark)), fetch=False)
+
+
+class TombstoneManager:
+    """Tracks rows removed from SQLite that still have nodes in Neo4j."""
+
+    @staticmethod
+    def get_tombstones() -> List[Tuple[int, str, str]]:
+        """Return (rowid, label, node_id) for every pending deletion."""
+        query = "SELECT rowid, label, node_id FROM tombstones ORDER BY rowid"
+        return SQLiteConnector.execute_query(query)
+
+    @staticmethod
+    def clear_tombstones(up_to_rowid: int) -> None:
+        """
+        Forget deletions that have been applied to Neo4j. Rows recorded
+        since they were read have higher rowids and are kept.
+        """
+        SQLiteConnector.execute_query(
+            "DELETE FROM tombstones WHERE rowid <= ?", (up_to_rowid,), fetch=False
+        )
+
+
+class ChangeLogManager:
+    """Numbers local changes to the rows mirrored in Neo4j."""
+
+    @staticmethod
+    def get_last_seq() -> int:
+        """
+        Return the number of the latest change. Changes committed after
+        this call get higher numbers, since SQLite has a single writer.
+        """
+        query = "SELECT MAX(seq) FROM change_log"
+        return SQLiteConnector.execute_query(query)[0][0] or 0
 
 
 class ProjectManager:
     """Handles operations related to projects."""
 
     @staticmethod
-    def get_projects_from_postgres() -> List[Dict[str, Any]]:
-        """Fetch projects from PostgreSQL database with caching."""
-        # Check if cached data exists
-        if PROJECT_CACHE_FILE.exists():
-            with open(PROJECT_CACHE_FILE, "r") as f:
-                logger.info("Using cached project data")
-                return json.load(f)
+    def stream_projects_from_postgres(
+        updated_since: Optional[str] = None, raw: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every listed project (or, with `updated_since`, every project
+        updated since the watermark) from a server-side cursor, without the
+        cache file or the 100-project cap. With `raw`, rows are yielded
+        unparsed so that extract_flat_project_data can run elsewhere.
+        """
+        query, params = ProjectManager._projects_query(updated_since)
+        for row in PostgresConnector.stream_query(query, params):
+            yield row if raw else extract_flat_project_data(row)
+
+    @staticmethod
+    def _projects_query(
+        updated_since: Optional[str] = None,
+    ) -> Tuple[str, Optional[tuple]]:
+        """Build the project extraction query and its parameters."""
+        if updated_since is not None:
+            # Rows updated exactly at the watermark are fetched again; the
+            # upsert is idempotent, and ">" could miss same-timestamp rows
+            filter_clause = 'WHERE p."updatedAt" >= %s'
+            order_clause = 'ORDER BY p."updatedAt"'
+            params = (updated_since,)
+        else:
+            filter_clause = "WHERE p.LISTED = TRUE"
+            order_clause = 'ORDER BY pipv."totalPower" DESC'
+            params = None
 
         # Query to fetch project data
-        query = """
+        query = f"""
             SELECT
                 p.ID,
                 p.TITLE,
@@ -254,14 +755,14 @@ class ProjectManager:
                     JSONB_OBJECT_AGG(
                         pa."chainType",
                         pa.networks
-                    ) FILTER (WHERE pa."chainType" IS NOT NULL), '{}'::JSONB
+                    ) FILTER (WHERE pa."chainType" IS NOT NULL), '{{}}'::JSONB
                 ) AS addresses,
 
                 COALESCE(
                     JSONB_OBJECT_AGG(
                         psm."type",
                         psm."link"
-                    ) FILTER (WHERE psm."link" IS NOT NULL), '{}'::JSONB
+                    ) FILTER (WHERE psm."link" IS NOT NULL), '{{}}'::JSONB
                 ) AS social_media,
 
                 pipv."totalPower",
@@ -284,31 +785,37 @@ class ProjectManager:
 
             LEFT JOIN public.project_social_media psm ON p.id = psm."projectId"
 
-            WHERE p.LISTED = TRUE
+            {filter_clause}
 
             GROUP BY 
                 p.ID, p.TITLE, p.DESCRIPTION, p."totalDonations", p."giveBacks", 
                 p."updatedAt", p.LISTED, qfr."isActive", u."walletAddress", pipv."totalPower", pipv."powerRank"
 
-            ORDER BY
-                pipv."totalPower" DESC
-
-            LIMIT 100;
+            {order_clause};
         """
 
-        results = PostgresConnector.execute_query(query)
-        projects = [extract_flat_project_data(p) for p in results]
-
-        # Cache the results
-        with open(PROJECT_CACHE_FILE, "w") as f:
-            json.dump(projects, f)
-
-        logger.info(f"Fetched {len(projects)} projects from PostgreSQL")
-        return projects
+        return query, params
 
     @staticmethod
     def save_project(project_data: Dict[str, Any]) -> None:
         """Insert or update a project in the SQLite database."""
+        SQLiteConnector.execute_query(
+            PROJECT_UPSERT_QUERY,
+            ProjectManager._project_params(project_data),
+            fetch=False,
+        )
+
+    @staticmethod
+    def save_projects(projects: List[Dict[str, Any]]) -> None:
+        """Insert or update many projects in a single transaction."""
+        SQLiteConnector.execute_many(
+            PROJECT_UPSERT_QUERY,
+            [ProjectManager._project_params(p) for p in projects],
+        )
+
+    @staticmethod
+    def _project_params(project_data: Dict[str, Any]) -> tuple:
+        """Build the PROJECT_UPSERT_QUERY parameters for a project."""
         # Extract fields from project data
         project_id = project_data["id"]
         title = project_data["title"]
@@ -351,58 +858,7 @@ class ProjectManager:
             "github": project_data["github"],
         }
 
-        query = """
-            INSERT INTO projects (
-                id, title, description, raised_amount, giv_power, giv_power_rank, listed, 
-                givbacks_eligible, in_active_qf_round, unique_donors, owner_wallet, 
-                polygon_address, celo_address, base_address, solana_address, 
-                ethereum_address, arbitrum_address, optimism_address, gnosis_address, 
-                stellar_address, zkevm_address, ethereum_classic_address, x, 
-                discord, telegram, instagram, facebook, github, linkedin, website, 
-                farcaster, youtube, reddit, lens, updated_at
-            )
-            VALUES (
-                ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 
-                ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-            )
-            ON CONFLICT(id) DO UPDATE SET
-                title = excluded.title,
-                raised_amount = excluded.raised_amount,
-                giv_power = excluded.giv_power,
-                giv_power_rank = excluded.giv_power_rank,
-                listed = excluded.listed,
-                description = excluded.description,
-                givbacks_eligible = excluded.givbacks_eligible,
-                in_active_qf_round = excluded.in_active_qf_round,
-                unique_donors = excluded.unique_donors,
-                owner_wallet = excluded.owner_wallet,
-                polygon_address = excluded.polygon_address,
-                celo_address = excluded.celo_address,
-                base_address = excluded.base_address,
-                solana_address = excluded.solana_address,
-                ethereum_address = excluded.ethereum_address,
-                arbitrum_address = excluded.arbitrum_address,
-                optimism_address = excluded.optimism_address,
-                gnosis_address = excluded.gnosis_address,
-                stellar_address = excluded.stellar_address,
-                zkevm_address = excluded.zkevm_address,
-                ethereum_classic_address = excluded.ethereum_classic_address,
-                x = excluded.x,
-                discord = excluded.discord,
-                telegram = excluded.telegram,
-                instagram = excluded.instagram,
-                facebook = excluded.facebook,
-                github = excluded.github,
-                linkedin = excluded.linkedin,
-                website = excluded.website,
-                farcaster = excluded.farcaster,
-                youtube = excluded.youtube,
-                reddit = excluded.reddit,
-                lens = excluded.lens,
-                updated_at = excluded.updated_at
-        """
-
-        params = (
+        return (
             project_id,
             title,
             description,
@@ -437,75 +893,173 @@ class ProjectManager:
             socials.get("youtube"),
             socials.get("reddit"),
             socials.get("lens"),
+            # Only set by the ingestion pipeline; NULL marks the chunks
+            # as unknown so the next pipeline run re-chunks the project
+            project_data.get("description_hash"),
             updated_at,
         )
 
-        SQLiteConnector.execute_query(query, params, fetch=False)
+    @staticmethod
+    def clear_description_hashes() -> None:
+        """Mark every project's chunks as unknown, to re-chunk them all."""
+        SQLiteConnector.execute_query(
+            "UPDATE projects SET description_hash = NULL", fetch=False
+        )
+
+    @staticmethod
+    def get_description_hashes(project_ids: List[int]) -> Dict[int, str]:
+        """Return the stored description hash of each given project."""
+        hashes = {}
+        for start in range(0, len(project_ids), 500):
+            ids = project_ids[start : start + 500]
+            placeholders = ", ".join("?" for _ in ids)
+            query = f"""
+                SELECT id, description_hash FROM projects
+                WHERE id IN ({placeholders})
+            """
+            results = SQLiteConnector.execute_query(query, tuple(ids))
+            hashes.update({row[0]: row[1] for row in results})
+
+        return hashes
+
+    @staticmethod
+    def get_project_ids_from_postgres() -> Set[int]:
+        """Return the id of every project in PostgreSQL, listed or not."""
+        query = "SELECT id FROM public.project"
+        return {row[0] for row in PostgresConnector.execute_query(query)}
+
+    @staticmethod
+    def get_project_ids(listed_only: bool = False) -> Set[int]:
+        """Return the ids of the stored projects, or of the listed ones."""
+        query = "SELECT id FROM projects" + (" WHERE listed" if listed_only else "")
+        return {row[0] for row in SQLiteConnector.execute_query(query)}
+
+    @staticmethod
+    def delist_projects(project_ids: List[int]) -> None:
+        """Mark the given projects as no longer listed."""
+        SQLiteConnector.execute_many(
+            "UPDATE projects SET listed = 0 WHERE id = ?",
+            [(project_id,) for project_id in project_ids],
+        )
+
+    @staticmethod
+    def delete_projects(project_ids: List[int]) -> List[str]:
+        """
+        Delete the given projects with their chunks and donations, in one
+        transaction. Returns the ids of the deleted chunks.
+        """
+        params = [(project_id,) for project_id in project_ids]
+        chunk_ids = [
+            chunk_id
+            for chunk_ids in ChunkManager.get_chunk_ids_by_project(project_ids).values()
+            for chunk_id in chunk_ids
+        ]
+        with SQLiteConnector.transaction():
+            SQLiteConnector.execute_many(
+                "DELETE FROM chunks WHERE project_id = ?", params
+            )
+            SQLiteConnector.execute_many(
+                "DELETE FROM donations WHERE project_id = ?", params
+            )
+            SQLiteConnector.execute_many("DELETE FROM projects WHERE id = ?", params)
+        return chunk_ids
 
     @staticmethod
     def get_all_projects() -> List[Dict[str, Any]]:
         """Retrieve all projects from SQLite database."""
-        query = """
-            SELECT 
-                id, title, raised_amount, giv_power, giv_power_rank, listed, 
-                updated_at, givbacks_eligible, description, in_active_qf_round, 
-                unique_donors, owner_wallet, polygon_address, celo_address, 
-                base_address, solana_address, ethereum_address, arbitrum_address, 
-                optimism_address, gnosis_address, stellar_address, zkevm_address, 
-                ethereum_classic_address, x, discord, telegram, instagram, facebook, 
-                github, linkedin, website, farcaster, youtube, reddit, lens 
+        query = f"""
+            SELECT {PROJECT_COLUMNS}
             FROM projects
         """
 
         results = SQLiteConnector.execute_query(query)
 
-        projects = []
-        for row in results:
-            projects.append(
-                {
-                    "id": row[0],
-                    "title": row[1],
-                    "raised_amount": row[2],
-                    "giv_power": row[3],
-                    "giv_power_rank": row[4],
-                    "listed": bool(row[5]),
-                    "updated_at": row[6],
-                    "givbacks_eligible": bool(row[7]),
-                    "description": row[8],
-                    "in_active_qf_round": bool(row[9]),
-                    "unique_donors": row[10],
-                    "owner_wallet": row[11],
-                    "addresses": {
-                        "polygon": row[12],
-                        "celo": row[13],
-                        "base": row[14],
-                        "solana": row[15],
-                        "ethereum": row[16],
-                        "arbitrum": row[17],
-                        "optimism": row[18],
-                        "gnosis": row[19],
-                        "stellar": row[20],
-                        "zkevm": row[21],
-                        "ethereum_classic": row[22],
-                    },
-                    "socials": {
-                        "x": row[23],
-                        "discord": row[24],
-                        "telegram": row[25],
-                        "instagram": row[26],
-                        "facebook": row[27],
-                        "github": row[28],
-                        "linkedin": row[29],
-                        "website": row[30],
-                        "farcaster": row[31],
-                        "youtube": row[32],
-                        "reddit": row[33],
-                        "lens": row[34],
-                    },
-                }
-            )
+        return [ProjectManager._project_from_row(row) for row in results]
+
+    @staticmethod
+    def iter_project_batches(
+        batch_size: int = SYNC_BATCH_SIZE, changed_after: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield listed projects from SQLite in lists of up to `batch_size`,
+        only those changed after change_log seq `changed_after` if given.
+        """
+        query = f"""
+            SELECT {PROJECT_COLUMNS}
+            FROM projects
+            WHERE listed
+        """
+        params = ()
+        if changed_after is not None:
+            query += """ AND id IN (
+                SELECT node_id FROM change_log WHERE label = 'Project' AND seq > ?
+            )"""
+            params = (changed_after,)
+
+        for rows in SQLiteConnector.iter_batches(query, params, batch_size):
+            yield [ProjectManager._project_from_row(row) for row in rows]
+
+    @staticmethod
+    def get_projects_by_ids(project_ids: List[int]) -> List[Dict[str, Any]]:
+        """Retrieve the given projects from SQLite database."""
+        if not project_ids:
+            return []
+
+        placeholders = ", ".join("?" for _ in project_ids)
+        query = f"""
+            SELECT {PROJECT_COLUMNS}
+            FROM projects
+            WHERE id IN ({placeholders})
+        """
 
-        return projects
+        results = SQLiteConnector.execute_query(query, tuple(project_ids))
+
+        return [ProjectManager._project_from_row(row) for row in results]
+
+    @staticmethod
+    def _project_from_row(row: tuple) -> Dict[str, Any]:
+        """Convert a row selected with PROJECT_COLUMNS into a project dict."""
+        return {
+            "id": row[0],
+            "title": row[1],
+            "raised_amount": row[2],
+            "giv_power": row[3],
+            "giv_power_rank": row[4],
+            "listed": bool(row[5]),
+            "updated_at": row[6],
+            "givbacks_eligible": bool(row[7]),
+            "description": row[8],
+            "in_active_qf_round": bool(row[9]),
+            "unique_donors": row[10],
+            "owner_wallet": row[11],
+            "addresses": {
+                "polygon": row[12],
+                "celo": row[13],
+                "base": row[14],
+                "solana": row[15],
+                "ethereum": row[16],
+                "arbitrum": row[17],
+                "optimism": row[18],
+                "gnosis": row[19],
+                "stellar": row[20],
+                "zkevm": row[21],
+                "ethereum_classic": row[22],
+            },
+            "socials": {
+                "x": row[23],
+                "discord": row[24],
+                "telegram": row[25],
+                "instagram": row[26],
+                "facebook": row[27],
+                "github": row[28],
+                "linkedin": row[29],
+                "website": row[30],
+                "farcaster": row[31],
+                "youtube": row[32],
+                "reddit": row[33],
+                "lens": row[34],
+            },
+        }
 
 
 class ChunkManager:
@@ -523,9 +1077,102 @@ class ChunkManager:
         except sqlite3.IntegrityError:
             logger.debug(f"Chunk {chunk_id} already exists, skipping")
 
+    @staticmethod
+    def save_chunks(chunks: List[Tuple[str, str, int]]) -> None:
+        """
+        Insert many (chunk_id, text, project_id) chunks in a single
+        transaction. Chunks that already exist keep their embedding.
+        """
+        query = """
+            INSERT INTO chunks (id, text, project_id) VALUES (?, ?, ?)
+            ON CONFLICT(id) DO NOTHING
+        """
+        SQLiteConnector.execute_many(query, chunks)
+
+    @staticmethod
+    def get_chunk_ids_by_project(project_ids: List[int]) -> Dict[int, List[str]]:
+        """Return the IDs of the chunks of each given project."""
+        chunk_ids = {project_id: [] for project_id in project_ids}
+        for start in range(0, len(project_ids), 500):
+            ids = project_ids[start : start + 500]
+            placeholders = ", ".join("?" for _ in ids)
+            query = f"SELECT project_id, id FROM chunks WHERE project_id IN ({placeholders})"
+            for project_id, chunk_id in SQLiteConnector.execute_query(
+                query, tuple(ids)
+            ):
+                chunk_ids[project_id].append(chunk_id)
+
+        return chunk_ids
+
+    @staticmethod
+    def delete_chunks(chunk_ids: List[str]) -> None:
+        """Delete the given chunks."""
+        SQLiteConnector.execute_many(
+            "DELETE FROM chunks WHERE id = ?", [(chunk_id,) for chunk_id in chunk_ids]
+        )
+
+    @staticmethod
+    def rekey_chunks(chunk_id: Callable[[int, str], str]) -> int:
+        """
+        Rebuild the chunks table with every chunk under the ID that
+        `chunk_id(project_id, text)` gives it, keeping text, project and
+        embedding, and without the UNIQUE text constraint of older
+        versions. Chunks that changed ID are tombstoned for Neo4j and
+        every chunk is logged for import again. Returns the number of
+        chunks that changed ID.
+        """
+        connection = SQLiteConnector.get_connection()
+        # Left behind if a previous attempt failed before the rename
+        connection.execute("DROP TABLE IF EXISTS chunks_rekeyed")
+        connection.create_function("chunk_id", 2, chunk_id, deterministic=True)
+
+        with SQLiteConnector.transaction():
+            cursor = connection.cursor()
+            try:
+                cursor.execute(CHUNKS_TABLE_QUERY.format(table="chunks_rekeyed"))
+                cursor.execute(
+                    """
+                    INSERT OR IGNORE INTO chunks_rekeyed
+                        (id, project_id, text, created_at, embedding)
+                    SELECT chunk_id(project_id, text), project_id, text,
+                        created_at, embedding
+                    FROM chunks
+                    """
+                )
+                cursor.execute(
+                    """
+                    INSERT OR REPLACE INTO tombstones (label, node_id)
+                    SELECT 'Chunk', id FROM chunks
+                    WHERE id NOT IN (SELECT id FROM chunks_rekeyed)
+                    """
+                )
+                rekeyed = cursor.rowcount
+                cursor.execute("DELETE FROM change_log WHERE label = 'Chunk'")
+                cursor.execute(
+                    """
+                    INSERT INTO change_log (label, node_id)
+                    SELECT 'Chunk', id FROM chunks_rekeyed
+                    """
+                )
+                cursor.execute("DROP TABLE chunks")
+                # Otherwise the rename checks the projects triggers, which
+                # refer to chunks, while no such table exists
+                cursor.execute("PRAGMA legacy_alter_table = ON")
+                cursor.execute("ALTER TABLE chunks_rekeyed RENAME TO chunks")
+            except sqlite3.Error as e:
+                logger.error(f"Chunk rekey error: {e}")
+                raise
+            finally:
+                cursor.execute("PRAGMA legacy_alter_table = OFF")
+                cursor.close()
+
+        # Dropping the old table dropped its indexes and triggers
+        DatabaseInitializer.create_tables()
+        return rekeyed
+
     @staticmethod
     def get_chunk(chunk_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve a specific chunk by ID."""
+        """Retrieve a specific chunk by ID; the embedding is a float32 array."""
         query = "SELECT id, text, embedding, project_id FROM chunks WHERE id = ?"
         results = SQLiteConnector.execute_query(query, (chunk_id,))
 
@@ -536,7 +1183,7 @@ class ChunkManager:
         return {
             "id": row[0],
             "text": row[1],
-            "embedding": json.loads(row[2]) if row[2] else None,
+            "embedding": decode_embedding(row[2]),
             "project_id": row[3],
         }
 
@@ -545,10 +1192,55 @@ class ChunkManager:
         """Update the embedding for a specific chunk."""
         query = "UPDATE chunks SET embedding = ? WHERE id = ?"
         SQLiteConnector.execute_query(
-            query, (json.dumps(embedding), chunk_id), fetch=False
+            query, (encode_embedding(embedding), chunk_id), fetch=False
         )
         logger.debug(f"Embedding updated for chunk {chunk_id}")
 
+    @staticmethod
+    def get_chunks_without_embedding(chunk_ids: List[str]) -> List[Dict[str, Any]]:
+        """Retrieve the given chunks that do not have an embedding yet."""
+        chunks = []
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(chunk_ids), 500):
+            ids = chunk_ids[start : start + 500]
+            placeholders = ", ".join("?" for _ in ids)
+            query = f"""
+                SELECT id, text, project_id FROM chunks
+                WHERE id IN ({placeholders}) AND embedding IS NULL
+            """
+            results = SQLiteConnector.execute_query(query, tuple(ids))
+            chunks.extend(
+                {"id": row[0], "text": row[1], "project_id": row[2]} for row in results
+            )
+
+        return chunks
+
+    @staticmethod
+    def get_chunks_to_embed(after_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Retrieve chunks without an embedding, in id order after `after_id`."""
+        query = """
+            SELECT id, text, project_id FROM chunks
+            WHERE embedding IS NULL AND id > ?
+            ORDER BY id
+            LIMIT ?
+        """
+        results = SQLiteConnector.execute_query(query, (after_id, limit))
+
+        return [{"id": row[0], "text": row[1], "project_id": row[2]} for row in results]
+
+    @staticmethod
+    def set_embeddings(embeddings: List[Tuple[str, List[float]]]) -> None:
+        """Update the embeddings of many chunks in a single transaction."""
+        query = "UPDATE chunks SET embedding = ? WHERE id = ?"
+        SQLiteConnector.execute_many(
+            query,
+            [
+                (encode_embedding(embedding), chunk_id)
+                for chunk_id, embedding in embeddings
+            ],
+        )
+        logger.debug(f"Embeddings updated for {len(embeddings)} chunks")
+
     @staticmethod
     def get_all_chunks() -> List[Dict[str, Any]]:
         """Retrieve all chunks with embeddings."""
@@ -559,47 +1251,159 @@ class ChunkManager:
         """
         results = SQLiteConnector.execute_query(query)
 
-        chunks = []
-        for row in results:
-            embedding_blob = row[4]
-
-            if embedding_blob is None:
-                continue
-
-            # Parse embedding from string or binary
-            if isinstance(embedding_blob, str):
-                embedding_array = ast.literal_eval(embedding_blob)
-            else:
-                embedding_array = np.frombuffer(
-                    embedding_blob, dtype=np.float32
-                ).tolist()
-
-            chunks.append(
-                {
-                    "id": row[0],
-                    "project_id": row[1],
-                    "text": row[2],
-                    "created_at": row[3],
-                    "embedding": embedding_array,
-                }
-            )
+        return [ChunkManager._chunk_from_row(row) for row in results]
 
-        return chunks
+    @staticmethod
+    def iter_chunk_batches(
+        batch_size: int = SYNC_BATCH_SIZE, changed_after: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield chunks with embeddings in lists of up to `batch_size`,
+        ordered by project, only those changed after change_log seq
+        `changed_after` if given. Setting an embedding or moving a chunk
+        to another project counts as a change. Only one batch of
+        embeddings is decoded into Python floats at a time.
+        """
+        query = """
+            SELECT id, project_id, text, created_at, embedding
+            FROM chunks
+            WHERE embedding IS NOT NULL
+        """
+        params = ()
+        if changed_after is not None:
+            query += """ AND id IN (
+                SELECT node_id FROM change_log WHERE label = 'Chunk' AND seq > ?
+            )"""
+            params = (changed_after,)
+        query += " ORDER BY project_id"
+
+        for rows in SQLiteConnector.iter_batches(query, params, batch_size):
+            yield [ChunkManager._chunk_from_row(row) for row in rows]
+
+    @staticmethod
+    def _chunk_from_row(row: tuple) -> Dict[str, Any]:
+        """Convert an (id, project_id, text, created_at, embedding) row."""
+        return {
+            "id": row[0],
+            "project_id": row[1],
+            "text": row[2],
+            "created_at": row[3],
+            "embedding": decode_embedding(row[4]).tolist(),
+        }
+
+    @staticmethod
+    def migrate_embeddings(batch_size: int = 500) -> int:
+        """
+        Rewrite embeddings stored as JSON text or headerless BLOBs in the
+        current binary format. Returns the number of rows converted.
+        """
+        connection = SQLiteConnector.get_connection()
+        cursor = connection.cursor()
+        migrated = 0
+
+        try:
+            while True:
+                cursor.execute(
+                    """
+                    SELECT id, embedding FROM chunks
+                    WHERE embedding IS NOT NULL
+                        AND (typeof(embedding) != 'blob' OR substr(embedding, 1, 3) != ?)
+                    LIMIT ?
+                    """,
+                    (EMBEDDING_MAGIC, batch_size),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                cursor.executemany(
+                    "UPDATE chunks SET embedding = ? WHERE id = ?",
+                    [
+                        (encode_embedding(decode_embedding(blob)), chunk_id)
+                        for chunk_id, blob in rows
+                    ],
+                )
+                connection.commit()
+                migrated += len(rows)
+
+            if migrated:
+                # Give the space freed by the JSON text back to the filesystem
+                connection.execute("VACUUM")
+        except sqlite3.Error as e:
+            logger.error(f"Embedding migration error: {e}")
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        if migrated:
+            logger.info(f"Migrated {migrated} embeddings to the binary format")
+        return migrated
+
+    @staticmethod
+    def get_chunk_texts(chunk_ids: List[str]) -> Dict[str, str]:
+        """Return a mapping of chunk ID to chunk text for the given IDs."""
+        if not chunk_ids:
+            return {}
+
+        placeholders = ", ".join("?" for _ in chunk_ids)
+        query = f"SELECT id, text FROM chunks WHERE id IN ({placeholders})"
+        results = SQLiteConnector.execute_query(query, tuple(chunk_ids))
+
+        return {row[0]: row[1] for row in results}
+
+    @staticmethod
+    def count_embeddings() -> int:
+        """Count chunks that have an embedding."""
+        query = "SELECT COUNT(*) FROM chunks WHERE embedding IS NOT NULL"
+        return SQLiteConnector.execute_query(query)[0][0]
+
+    @staticmethod
+    def iter_embeddings() -> Iterator[Tuple[str, int, np.ndarray]]:
+        """Yield (chunk_id, project_id, float32 embedding) for embedded chunks."""
+        connection = SQLiteConnector.get_connection()
+        cursor = connection.cursor()
+
+        try:
+            cursor.execute(
+                "SELECT id, project_id, embedding FROM chunks WHERE embedding IS NOT NULL"
+            )
+            for chunk_id, project_id, embedding_blob in cursor:
+                yield chunk_id, project_id, decode_embedding(embedding_blob)
+        finally:
+            cursor.close()
 
 
 class DonationManager:
     """Handles operations related to donations."""
 
     @staticmethod
-    def get_donations_from_postgres() -> List[Dict[str, Any]]:
-        """Fetch donations from PostgreSQL database."""
+    def stream_donations_from_postgres(
+        after_id: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every donation (or, with `after_id`, every donation with a
+        higher id) in id order from a server-side cursor, without the cache
+        file or the top-100-projects restriction.
+        """
+        query, params = DonationManager._donations_query(after_id)
+        for row in PostgresConnector.stream_query(query, params):
+            yield DonationManager._donation_from_postgres(row)
 
-        if DONATION_CACHE_FILE.exists():
-            with open(DONATION_CACHE_FILE, "r") as f:
-                return json.load(f)
+    @staticmethod
+    def _donations_query(
+        after_id: Optional[int] = None,
+    ) -> Tuple[str, Optional[tuple]]:
+        """Build the donation extraction query and its parameters."""
+        if after_id is not None:
+            filter_clause = "AND DONATION.id > %s"
+            params = (after_id,)
+        else:
+            filter_clause = ""
+            params = None
 
         # Query donations from PostgreSQL
-        query = """
+        query = f"""
             SELECT
                 DONATION.id,
                 "projectId",
@@ -614,65 +1418,54 @@ class DonationManager:
                 "transactionNetworkId",
                 "tokenAddress",
                 "chainType"
-            FROM
-                DONATION
-                INNER JOIN (
-                    SELECT
-                        ID,
-                        "totalPower" AMOUNT
-                    FROM
-                        PROJECT
-                        INNER JOIN PUBLIC.PROJECT_INSTANT_POWER_VIEW PIPV ON PROJECT.ID = PIPV."projectId"
-                    ORDER BY
-                        PIPV."totalPower" DESC
-                    LIMIT
-                        100
-                ) AS P ON DONATION."projectId" = P.ID
+            FROM DONATION
                 WHERE DONATION."valueUsd" >= 1
+                {filter_clause}
+            ORDER BY DONATION.id
         """
 
-        # Execute query
-        results = PostgresConnector.execute_query(query)
-
-        donations = []
-        for donation in results:
-            donations.append(
-                {
-                    "id": donation[0],
-                    "projectId": donation[1],
-                    "transactionId": donation[2],
-                    "toWalletAddress": donation[3],
-                    "fromWalletAddress": donation[4],
-                    "currency": donation[5],
-                    "anonymous": donation[6],
-                    "amount": donation[7],
-                    "valueUsd": donation[8],
-                    "createdAt": donation[9].isoformat() if donation[9] else None,
-                    "transactionNetworkId": donation[10],
-                    "tokenAddress": donation[11],
-                    "chainType": donation[12],
-                }
-            )
-
-        # Cache the results
-        with open(DONATION_CACHE_FILE, "w") as f:
-            json.dump(donations, f)
+        return query, params
 
-        return donations
+    @staticmethod
+    def _donation_from_postgres(donation: tuple) -> Dict[str, Any]:
+        """Convert a row of the donation extraction query into a dict."""
+        return {
+            "id": donation[0],
+            "projectId": donation[1],
+            "transactionId": donation[2],
+            "toWalletAddress": donation[3],
+            "fromWalletAddress": donation[4],
+            "currency": donation[5],
+            "anonymous": donation[6],
+            "amount": donation[7],
+            "valueUsd": donation[8],
+            "createdAt": donation[9].isoformat() if donation[9] else None,
+            "transactionNetworkId": donation[10],
+            "tokenAddress": donation[11],
+            "chainType": donation[12],
+        }
 
     @staticmethod
     def save_donation(donation_data: Dict[str, Any]) -> None:
         """Insert a donation if it doesn't already exist."""
-        query = """
-            INSERT INTO donations (
-                id, project_id, tx_hash, to_address, from_address, currency, 
-                anonymous, amount, value_usd, created_at, chain_id, token_address, chain_type
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(id) DO NOTHING
-        """
+        SQLiteConnector.execute_query(
+            DONATION_INSERT_QUERY,
+            DonationManager._donation_params(donation_data),
+            fetch=False,
+        )
+
+    @staticmethod
+    def save_donations(donations: List[Dict[str, Any]]) -> None:
+        """Insert many donations in a single transaction, skipping existing ones."""
+        SQLiteConnector.execute_many(
+            DONATION_INSERT_QUERY,
+            [DonationManager._donation_params(d) for d in donations],
+        )
 
-        params = (
+    @staticmethod
+    def _donation_params(donation_data: Dict[str, Any]) -> tuple:
+        """Build the DONATION_INSERT_QUERY parameters for a donation."""
+        return (
             donation_data.get("id"),
             donation_data.get("projectId"),
             donation_data.get("transactionId"),
@@ -688,65 +1481,72 @@ class DonationManager:
             donation_data.get("chainType"),
         )
 
-        SQLiteConnector.execute_query(query, params, fetch=False)
-
     @staticmethod
     def get_all_donations() -> List[Dict[str, Any]]:
         """Retrieve all donations from SQLite database."""
-        query = """
-            SELECT 
-                id, project_id, tx_hash, to_address, from_address, currency, 
-                anonymous, amount, value_usd, created_at, chain_id, token_address, chain_type 
+        query = f"""
+            SELECT {DONATION_COLUMNS}
             FROM donations
         """
 
         results = SQLiteConnector.execute_query(query)
 
-        donations = []
-        for row in results:
-            donations.append(
-                {
-                    "id": row[0],
-                    "project_id": row[1],
-                    "tx_hash": row[2],
-                    "to_address": row[3],
-                    "from_address": row[4],
-                    "currency": row[5],
-                    "anonymous": bool(row[6]),
-                    "amount": row[7],
-                    "value_usd": row[8],
-                    "created_at": row[9],
-                    "chain_id": row[10],
-                    "token_address": row[11],
-                    "chain_type": row[12],
-                }
-            )
-
-        return donations
-
-
-class DataSynchronizer:
-    """Handles synchronization between PostgreSQL and SQLite databases."""
+        return [DonationManager._donation_from_row(row) for row in results]
 
     @staticmethod
-    def sync_projects():
-        """Synchronize projects from PostgreSQL to SQLite."""
-        projects = ProjectManager.get_projects_from_postgres()
-
-        for project in projects:
-            ProjectManager.save_project(project)
+    def iter_donation_batches(
+        batch_size: int = SYNC_BATCH_SIZE, changed_after: Optional[int] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield donations ordered by project in lists of up to `batch_size`,
+        only those changed after change_log seq `changed_after` if given.
+        Listing a project again counts as a change to all its donations.
+        """
+        query = f"""
+            SELECT {DONATION_COLUMNS}
+            FROM donations
+        """
+        params = ()
+        if changed_after is not None:
+            query += """ WHERE id IN (
+                SELECT node_id FROM change_log WHERE label = 'Donation' AND seq > ?
+            )"""
+            params = (changed_after,)
+        query += " ORDER BY project_id"
 
-        logger.info(f"Synchronized {len(projects)} projects")
+        for rows in SQLiteConnector.iter_batches(query, params, batch_size):
+            yield [DonationManager._donation_from_row(row) for row in rows]
 
     @staticmethod
-    def sync_donations():
-        """Synchronize donations from PostgreSQL to SQLite."""
-        donations = DonationManager.get_donations_from_postgres()
+    def _donation_from_row(row: tuple) -> Dict[str, Any]:
+        """Convert a row selected with DONATION_COLUMNS into a donation dict."""
+        return {
+            "id": row[0],
+            "project_id": row[1],
+            "tx_hash": row[2],
+            "to_address": row[3],
+            "from_address": row[4],
+            "currency": row[5],
+            "anonymous": bool(row[6]),
+            "amount": row[7],
+            "value_usd": row[8],
+            "created_at": row[9],
+            "chain_id": row[10],
+            "token_address": row[11],
+            "chain_type": row[12],
+        }
 
-        for donation in donations:
-            DonationManager.save_donation(donation)
 
-        logger.info(f"Synchronized {len(donations)} donations")
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield lists of up to `size` consecutive items from `iterable`."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
 def test_chunk_duplicate_insertion():
@@ -762,7 +1562,7 @@ def test_chunk_duplicate_insertion():
     cursor = connection.cursor()
     cursor.execute("SELECT COUNT(*) FROM chunks WHERE id = 'test-chunk-123'")
     count = cursor.fetchone()[0]
-    connection.close()
+    cursor.close()
 
     assert count == 1, "Chunk was added twice!"
     logger.info("Duplicate chunk insertion test passed")
@@ -771,6 +1571,8 @@ def test_chunk_duplicate_insertion():
 def initialize_database():
     """Initialize the database and create required tables."""
     DatabaseInitializer.create_tables()
+    DatabaseInitializer.migrate_schema()
+    ChunkManager.migrate_embeddings()
     logger.info("Local database initialized!")
 
 
@@ -1,21 +1,38 @@
-import logging
-from database import ChunkManager
+from functools import lru_cache
+from typing import Iterator, List
+
+import tiktoken
+
 from utils.openai import generate_embedding
+from config.config import EMBEDDING_MODEL, EMBEDDING_BATCH_TOKENS, EMBEDDING_BATCH_SIZE
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    return tiktoken.encoding_for_model(EMBEDDING_MODEL)
 
-logging.basicConfig(level=logging.INFO)
 
+def count_tokens(text: str) -> int:
+    """Number of tokens the embedding model will see for `text`."""
+    return len(_encoding().encode(text, disallowed_special=()))
 
-def embed_chunk(uuid: str) -> None:
-    """Embeds a text chunk if it is not already embedded."""
-    chunk = ChunkManager.get_chunk(uuid)
-    if chunk is None:
-        logging.error(f"Chunk with ID {uuid} not found.")
-        return
 
-    if not chunk.get("embedding"):
-        embedding = generate_embedding(chunk["text"])
-        ChunkManager.set_embedding(uuid, embedding)
-        logging.info(f"Embedding stored for chunk ID: {uuid}")
+def batch_by_tokens(
+    chunks: List[dict],
+    max_tokens: int = EMBEDDING_BATCH_TOKENS,
+    max_size: int = EMBEDDING_BATCH_SIZE,
+) -> Iterator[List[dict]]:
+    """Group chunks into request-sized batches by token count and size."""
+    batch, batch_tokens = [], 0
+    for chunk in chunks:
+        tokens = count_tokens(chunk["text"])
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_size):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(chunk)
+        batch_tokens += tokens
+    if batch:
+        yield batch
 
 
 if __name__ == "__main__":
@@ -0,0 +1,285 @@
+import csv
+import argparse
+from pathlib import Path
+from typing import Any, List, Tuple
+
+from database import (
+    DATA_DIR,
+    ChangeLogManager,
+    SQLiteConnector,
+    SyncStateManager,
+    TombstoneManager,
+    decode_embedding,
+)
+
+EXPORT_DIR = DATA_DIR / "neo4j_import"
+
+# Rows read from SQLite per fetch
+BATCH_SIZE = 5000
+
+# (property, neo4j-admin type) of the Project properties Neo4jImporter
+# sets. SQLite columns have the same names; "string" needs no annotation.
+PROJECT_PROPERTIES = [
+    ("title", "string"),
+    ("raised_amount", "double"),
+    ("giv_power", "double"),
+    ("giv_power_rank", "long"),
+    ("listed", "boolean"),
+    ("givbacks_eligible", "boolean"),
+    ("in_active_qf_round", "boolean"),
+    ("unique_donors", "long"),
+    ("owner_wallet", "string"),
+    ("ethereum_address", "string"),
+    ("polygon_address", "string"),
+    ("optimism_address", "string"),
+    ("celo_address", "string"),
+    ("base_address", "string"),
+    ("arbitrum_address", "string"),
+    ("gnosis_address", "string"),
+    ("zkevm_address", "string"),
+    ("ethereum_classic_address", "string"),
+    ("stellar_address", "string"),
+    ("solana_address", "string"),
+    ("x", "string"),
+    ("facebook", "string"),
+    ("instagram", "string"),
+    ("youtube", "string"),
+    ("linkedin", "string"),
+    ("reddit", "string"),
+    ("discord", "string"),
+    ("farcaster", "string"),
+    ("lens", "string"),
+    ("website", "string"),
+    ("telegram", "string"),
+    ("github", "string"),
+    ("updated_at", "string"),
+]
+
+DONATION_PROPERTIES = [
+    ("project_id", "long"),
+    ("tx_hash", "string"),
+    ("to_address", "string"),
+    ("from_address", "string"),
+    ("currency", "string"),
+    ("anonymous", "boolean"),
+    ("amount", "double"),
+    ("value_usd", "double"),
+    ("created_at", "string"),
+    ("chain_id", "long"),
+    ("token_address", "string"),
+    ("chain_type", "string"),
+]
+
+
+def _header(properties: List[Tuple[str, str]]) -> List[str]:
+    return [name if kind == "string" else f"{name}:{kind}" for name, kind in properties]
+
+
+def _column_list(alias: str, properties: List[Tuple[str, str]]) -> str:
+    return ", ".join(f"{alias}.{name}" for name, _ in properties)
+
+
+class BulkCsvExporter:
+    """
+    Writes the graph Neo4jImporter builds as header-annotated CSV files
+    for `neo4j-admin database import full`, which loads them offline
+    without transactions. Only what the importer would create is
+    exported: listed projects, their embedded chunks and their donations.
+    """
+
+    def __init__(self, output_dir: Path = EXPORT_DIR):
+        self.output_dir = Path(output_dir)
+        # neo4j-admin only parses quoted line breaks when told to, at the
+        # cost of parsing each file on one thread
+        self.multiline = False
+
+    def _writer(self, name: str, header: List[str]):
+        handle = open(self.output_dir / name, "w", newline="", encoding="utf-8")
+        writer = csv.writer(handle, lineterminator="\n")
+        writer.writerow(header)
+        return handle, writer
+
+    def _value(self, value: Any, kind: str = "string") -> Any:
+        # Like the importer, which converts flags with bool()
+        if kind == "boolean":
+            return "true" if value else "false"
+        # Empty unquoted fields are imported as missing properties
+        if value is None:
+            return None
+        if isinstance(value, str) and ("\n" in value or "\r" in value):
+            self.multiline = True
+        return value
+
+    def _values(self, row: tuple, properties: List[Tuple[str, str]]) -> List[Any]:
+        return [self._value(v, kind) for v, (_, kind) in zip(row, properties)]
+
+    def export_projects(self) -> int:
+        """Write Project nodes, keyed by id in the Project ID space."""
+        query = f"""
+            SELECT p.id, {_column_list("p", PROJECT_PROPERTIES)}
+            FROM projects p
+            WHERE p.listed
+        """
+        handle, writer = self._writer(
+            "projects.csv", [":ID(Project)", "id:long"] + _header(PROJECT_PROPERTIES)
+        )
+
+        count = 0
+        with handle:
+            for rows in SQLiteConnector.iter_batches(query, batch_size=BATCH_SIZE):
+                for row in rows:
+                    values = self._values(row[1:], PROJECT_PROPERTIES)
+                    writer.writerow([row[0], row[0]] + values)
+                count += len(rows)
+        return count
+
+    def export_chunks(self) -> int:
+        """
+        Write Chunk nodes with their embeddings as float arrays, and the
+        HAS_CHUNK relationships from their projects.
+        """
+        query = """
+            SELECT c.id, c.project_id, c.text, c.created_at, c.embedding
+            FROM chunks c
+            JOIN projects p ON p.id = c.project_id
+            WHERE p.listed AND c.embedding IS NOT NULL
+        """
+        nodes, node_writer = self._writer(
+            "chunks.csv", ["id:ID(Chunk)", "text", "created_at", "embedding:float[]"]
+        )
+        rels, rel_writer = self._writer(
+            "has_chunk.csv", [":START_ID(Project)", ":END_ID(Chunk)"]
+        )
+
+        count = 0
+        with nodes, rels:
+            for rows in SQLiteConnector.iter_batches(query, batch_size=BATCH_SIZE):
+                for chunk_id, project_id, text, created_at, blob in rows:
+                    embedding = decode_embedding(blob).tolist()
+                    # %.9g round-trips float32, the type of a float[] element
+                    vector = ";".join(["%.9g"] * len(embedding)) % tuple(embedding)
+                    node_writer.writerow(
+                        [chunk_id, self._value(text), created_at, vector]
+                    )
+                    rel_writer.writerow([project_id, chunk_id])
+                count += len(rows)
+        return count
+
+    def export_donations(self) -> int:
+        """Write Donation nodes and the HAS_DONATION relationships."""
+        query = f"""
+            SELECT d.id, {_column_list("d", DONATION_PROPERTIES)}
+            FROM donations d
+            JOIN projects p ON p.id = d.project_id
+            WHERE p.listed
+        """
+        nodes, node_writer = self._writer(
+            "donations.csv",
+            [":ID(Donation)", "id:long"] + _header(DONATION_PROPERTIES),
+        )
+        rels, rel_writer = self._writer(
+            "has_donation.csv", [":START_ID(Project)", ":END_ID(Donation)"]
+        )
+
+        count = 0
+        with nodes, rels:
+            for rows in SQLiteConnector.iter_batches(query, batch_size=BATCH_SIZE):
+                for row in rows:
+                    values = self._values(row[1:], DONATION_PROPERTIES)
+                    node_writer.writerow([row[0], row[0]] + values)
+                    rel_writer.writerow([row[1], row[0]])
+                count += len(rows)
+        return count
+
+    def import_command(self, database: str) -> str:
+        """The neo4j-admin command that loads the exported files."""
+        path = self.output_dir.resolve()
+        arguments = [
+            f"neo4j-admin database import full {database}",
+            f"--nodes=Project={path / 'projects.csv'}",
+            f"--nodes=Chunk={path / 'chunks.csv'}",
+            f"--nodes=Donation={path / 'donations.csv'}",
+            f"--relationships=HAS_CHUNK={path / 'has_chunk.csv'}",
+            f"--relationships=HAS_DONATION={path / 'has_donation.csv'}",
+            "--array-delimiter=';'",
+            "--overwrite-destination=true",
+        ]
+        if self.multiline:
+            arguments.append("--multiline-fields=true")
+        return " \\\n    ".join(arguments)
+
+    def export(self) -> Tuple[int, int]:
+        """
+        Export every file. Returns the change_log seq and the last
+        tombstone rowid the export reflects, to pass to `mark_synced`
+        once neo4j-admin has loaded it.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Taken before reading, like Neo4jImporter.sync does
+        watermark = ChangeLogManager.get_last_seq()
+        tombstones = TombstoneManager.get_tombstones()
+
+        print(f"✅ {self.export_projects()} projects exported")
+        print(f"✅ {self.export_chunks()} chunks exported")
+        print(f"✅ {self.export_donations()} donations exported")
+
+        return watermark, tombstones[-1][0] if tombstones else 0
+
+    @staticmethod
+    def mark_synced(watermark: int, tombstone_rowid: int = 0) -> None:
+        """
+        Record an export as imported: move the delta import's watermark
+        to it and clear the tombstones it already reflects, so the next
+        sync only pushes rows written after the export. Run only after
+        the offline import has succeeded.
+        """
+        SyncStateManager.set_watermark("neo4j_changes", watermark)
+        if tombstone_rowid:
+            TombstoneManager.clear_tombstones(tombstone_rowid)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export SQLite data as CSV files for neo4j-admin bulk import"
+    )
+    parser.add_argument("--output-dir", type=Path, default=EXPORT_DIR)
+    parser.add_argument("--database", default="neo4j", help="database to import into")
+    parser.add_argument(
+        "--mark-synced",
+        type=int,
+        metavar="SEQ",
+        help="after a successful import, record the export taken at change "
+        "seq SEQ as imported instead of exporting",
+    )
+    parser.add_argument(
+        "--tombstones-through",
+        type=int,
+        default=0,
+        metavar="ROWID",
+        help="with --mark-synced, the last tombstone the export reflects",
+    )
+    args = parser.parse_args()
+
+    if args.mark_synced is not None:
+        BulkCsvExporter.mark_synced(args.mark_synced, args.tombstones_through)
+        print(f"✅ Neo4j import watermark set to change seq {args.mark_synced}")
+    else:
+        exporter = BulkCsvExporter(args.output_dir)
+        watermark, tombstone_rowid = exporter.export()
+
+        print("\nStop Neo4j, then load the files with:\n")
+        print(exporter.import_command(args.database))
+        print(
+            "\nStart Neo4j and run `python src/neo4j_utils.py` to create the "
+            "constraints and indexes."
+        )
+        print(
+            f"\nThe export reflects change seq {watermark}. Once the import "
+            "succeeds, run this before the first sync so it only pushes "
+            "later changes:\n"
+        )
+        print(
+            f"python src/export_bulk_csv.py --mark-synced {watermark} "
+            f"--tombstones-through {tombstone_rowid}"
+        )
@@ -2,9 +2,17 @@ import hashlib
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 
-def generate_chunk_uuid(chunk_text: str) -> str:
-    """Generate a consistent UUID (MD5 hash) for a given chunk of text."""
-    return hashlib.md5(chunk_text.encode()).hexdigest()
+def generate_chunk_uuid(project_id: int, chunk_text: str) -> str:
+    """
+    Generate a consistent UUID (MD5 hash) for a chunk of a project's text.
+    Projects that share a paragraph each get their own chunk.
+    """
+    return hashlib.md5(f"{project_id}:{chunk_text}".encode()).hexdigest()
+
+
+def description_hash(description: str) -> str:
+    """Hash a project description, to detect when it must be re-chunked."""
+    return hashlib.md5((description or "").encode()).hexdigest()
 
 
 def chunk_text(content: str, chunk_size: int = 512, chunk_overlap: int = 50) -> list:
@@ -1,13 +1,155 @@
 from bs4 import BeautifulSoup
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+from html.parser import HTMLParser
 import re
 import html
 
+# Elements whose text BeautifulSoup's get_text() leaves out
+_SKIPPED_TEXT_TAGS = frozenset(HTMLParserTreeBuilder.DEFAULT_STRING_CONTAINERS)
+_VOID_TAGS = frozenset(HTMLParserTreeBuilder().empty_element_tags)
+
+# How BeautifulSoup 4.14+ decodes numeric character references; older
+# versions guess at Windows-1252 instead (see _TextExtractor.handle_charref)
+_numeric_character_reference = getattr(
+    UnicodeDammit, "numeric_character_reference", None
+)
+# Before BeautifulSoup 4.14, the end event of <tag/> is the one that
+# crosses off an earlier void <tag>, so a later </tag> is not ignored
+_SELF_CLOSING_CHECKS_CLOSED = "|" in BeautifulSoup(
+    "<br><br/>a</br>b", "html.parser"
+).get_text("|")
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Collects the text nodes BeautifulSoup's html.parser tree builder would
+    create, without building the tree. Tag, comment and declaration events
+    end a text node; text inside script, style, template, rt and rp (but
+    not CDATA sections), and comments, doctypes and processing
+    instructions, is dropped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.strings = []
+        self._data = []
+        self._open_tags = []
+        self._skipping = 0
+        self._closed_void_tags = []
+
+    def _end_data(self, keep: bool = True, cdata: bool = False) -> None:
+        if self._data:
+            # Like BeautifulSoup, CDATA stays text even inside skipped tags
+            if keep and (cdata or not self._skipping):
+                self.strings.append("".join(self._data))
+            self._data = []
+
+    def _push(self, tag: str) -> None:
+        self._open_tags.append(tag)
+        if tag in _SKIPPED_TEXT_TAGS:
+            self._skipping += 1
+
+    def _pop_to(self, tag: str) -> None:
+        if tag not in self._open_tags:
+            return
+        while True:
+            popped = self._open_tags.pop()
+            if popped in _SKIPPED_TEXT_TAGS:
+                self._skipping -= 1
+            if popped == tag:
+                break
+
+    def handle_starttag(self, tag, attrs, void_closes=True):
+        self._end_data()
+        self._push(tag)
+        if tag in _VOID_TAGS and void_closes:
+            self.handle_endtag(tag, check_closed=False)
+            self._closed_void_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, void_closes=False)
+        self.handle_endtag(tag, check_closed=_SELF_CLOSING_CHECKS_CLOSED)
+
+    def handle_endtag(self, tag, check_closed=True):
+        # An explicit end tag for a void element that was already closed
+        if check_closed and tag in self._closed_void_tags:
+            self._closed_void_tags.remove(tag)
+            return
+        self._end_data()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_charref(self, name):
+        number = int(name[1:], 16) if name[:1] in ("x", "X") else int(name)
+        if _numeric_character_reference is not None:
+            self.handle_data(_numeric_character_reference(number)[0])
+            return
+
+        data = None
+        if number < 256:
+            # Low references often mean Windows-1252 code points
+            try:
+                data = bytearray([number]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(number)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, data):
+        self._end_data()
+
+    def handle_pi(self, data):
+        self._end_data()
+
+    def unknown_decl(self, data):
+        self._end_data()
+        # CDATA sections are text; other declarations are not
+        if data.upper().startswith("CDATA["):
+            self._data.append(data[len("CDATA[") :])
+            self._end_data(cdata=True)
+        else:
+            self._data.append(data)
+            self._end_data(keep=False)
+
+    def text(self) -> str:
+        self.close()
+        self._end_data()
+        return " ".join(self.strings)
+
+
+def _normalize_text(text: str) -> str:
+    text = html.unescape(text).strip()
+    return re.sub(r"\s+", " ", text)
+
 
 def clean_html(html_content: str) -> str:
     """Removes HTML tags, decodes entities, and cleans text."""
+    extractor = _TextExtractor()
+    extractor.feed(html_content)
+    return _normalize_text(extractor.text())
+
+
+def clean_html_soup(html_content: str) -> str:
+    """
+    The original BeautifulSoup implementation of clean_html, kept as the
+    reference its output is checked against.
+    """
     soup = BeautifulSoup(html_content, "html.parser")
-    text = html.unescape(soup.get_text(separator=" ")).strip()
-    return re.sub(r"\s+", " ", text)
+    return _normalize_text(soup.get_text(separator=" "))
 
 
 if __name__ == "__main__":
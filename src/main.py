@@ -1,30 +1,25 @@
+import argparse
 import openai
 import sqlite3
-from helper.chunking import chunk_text, generate_chunk_uuid
-from database import DonationManager, ProjectManager, ChunkManager
+from pipeline import run_ingestion
 from config.config import OPENAI_API_KEY
-from embedding import embed_chunk
+from backfill_embeddings import backfill_embeddings
 
 openai.api_key = OPENAI_API_KEY
 
 
 if __name__ == "__main__":
-    projects = ProjectManager.get_projects_from_postgres()
+    parser = argparse.ArgumentParser(description="Sync Giveth data into SQLite")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only fetch projects and donations changed since the last sync",
+    )
+    args = parser.parse_args()
 
-    print(f"Found {len(projects)} projects")
-    for project in projects:
+    # Fetch, clean, chunk, persist and embed run as concurrent stages
+    run_ingestion(incremental=args.incremental)
 
-        ProjectManager.save_project(project)
-
-        chunks = chunk_text(project["description"])
-        for chunk in chunks:
-            print(chunk)
-            uuid = generate_chunk_uuid(chunk)
-            ChunkManager.save_chunk(uuid, chunk, project["id"])
-            embed_chunk(uuid)
-            print(uuid)
-            print("-" * 40)
-
-    donations = DonationManager.get_donations_from_postgres()
-    for donation in donations:
-        DonationManager.save_donation(donation)
+    # Embed every chunk still missing an embedding; failed batches are
+    # logged and picked up again by the next run
+    backfill_embeddings()
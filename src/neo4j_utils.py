@@ -1,6 +1,117 @@
-from database import ChunkManager, ProjectManager, DonationManager
+import time
+import atexit
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from database import (
+    ChangeLogManager,
+    ChunkManager,
+    ProjectManager,
+    DonationManager,
+    SyncStateManager,
+    TombstoneManager,
+    batched,
+    initialize_database,
+)
 from neo4j import GraphDatabase
-from config.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+from config.config import (
+    NEO4J_URI,
+    NEO4J_USER,
+    NEO4J_PASSWORD,
+    NEO4J_MAX_POOL_SIZE,
+    NEO4J_ACQUISITION_TIMEOUT,
+    NEO4J_MAX_CONNECTION_LIFETIME,
+    EMBEDDING_DIMENSIONS,
+    NEO4J_IMPORT_BATCH_SIZE,
+    NEO4J_IMPORT_CHUNK_BATCH_SIZE,
+    NEO4J_IMPORT_WORKERS,
+    NEO4J_IMPORT_RETRIES,
+)
+
+# Vector index backing chunk similarity search. Its cosine score is
+# normalized to [0, 1] as (1 + cosine) / 2, so queries convert it back
+# with `2 * score - 1` before applying a cosine threshold.
+CHUNK_VECTOR_INDEX = "chunk_embedding_index"
+
+# Constraints back every MERGE/MATCH on an id with a unique index, and
+# the property indexes cover what generated Cypher filters on most
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT project_id_unique IF NOT EXISTS "
+    "FOR (p:Project) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT chunk_id_unique IF NOT EXISTS "
+    "FOR (c:Chunk) REQUIRE c.id IS UNIQUE",
+    "CREATE CONSTRAINT donation_id_unique IF NOT EXISTS "
+    "FOR (d:Donation) REQUIRE d.id IS UNIQUE",
+    "CREATE INDEX project_listed IF NOT EXISTS FOR (p:Project) ON (p.listed)",
+    "CREATE INDEX project_giv_power_rank IF NOT EXISTS "
+    "FOR (p:Project) ON (p.giv_power_rank)",
+    "CREATE INDEX donation_created_at IF NOT EXISTS "
+    "FOR (d:Donation) ON (d.created_at)",
+    "CREATE INDEX donation_value_usd IF NOT EXISTS "
+    "FOR (d:Donation) ON (d.value_usd)",
+]
+
+# Removes a tombstoned node. A project takes its donations along; its
+# chunks are deleted from SQLite with it and have tombstones of their own.
+DELETE_QUERIES = {
+    "Chunk": """
+        UNWIND $data AS id
+        MATCH (c:Chunk {id: id})
+        DETACH DELETE c
+    """,
+    "Donation": """
+        UNWIND $data AS id
+        MATCH (d:Donation {id: toInteger(id)})
+        DETACH DELETE d
+    """,
+    "Project": """
+        UNWIND $data AS id
+        MATCH (p:Project {id: toInteger(id)})
+        // A delisted project's chunks have no tombstones of their own
+        OPTIONAL MATCH (p)-[:HAS_CHUNK]->(c)
+        DETACH DELETE c
+        WITH DISTINCT p
+        OPTIONAL MATCH (p)-[:HAS_DONATION]->(d)
+        DETACH DELETE p, d
+    """,
+}
+
+_driver = None
+_driver_lock = threading.Lock()
+
+
+def get_driver():
+    """
+    Return the process-wide Neo4j driver, creating it on first use.
+    The driver owns a connection pool, so callers should open sessions
+    on it and never close it themselves.
+    """
+    global _driver
+    if _driver is None:
+        with _driver_lock:
+            if _driver is None:
+                _driver = GraphDatabase.driver(
+                    NEO4J_URI,
+                    auth=(NEO4J_USER, NEO4J_PASSWORD),
+                    max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+                    connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+                    max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+                )
+    return _driver
+
+
+def close_driver():
+    """Close the process-wide driver and release its pooled connections."""
+    global _driver
+    with _driver_lock:
+        if _driver is not None:
+            _driver.close()
+            _driver = None
+
+
+atexit.register(close_driver)
 
 
 class Neo4jImporter:
@@ -12,8 +123,8 @@ class Neo4jImporter:
         self.driver = self.get_driver()
 
     def get_driver(self):
-        """Get a Neo4j driver instance."""
-        return GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        """Get the shared Neo4j driver instance."""
+        return get_driver()
 
     def test_connection(self):
         """Test connection to Neo4j database."""
@@ -21,16 +132,160 @@ class Neo4jImporter:
             result = session.run("RETURN 'Neo4j Connected' AS message")
             return result.single()["message"]
 
+    def ensure_schema(self):
+        """
+        Create the uniqueness constraints, property indexes and chunk
+        vector index if they do not exist, and wait until all are online.
+        Safe to run before every import.
+        """
+        with self.driver.session() as session:
+            for statement in SCHEMA_STATEMENTS:
+                session.run(statement).consume()
+
+        self.create_vector_index()
+
+    def create_vector_index(self):
+        """Create the vector index on Chunk.embedding if it does not exist."""
+        query = f"""
+        CREATE VECTOR INDEX {CHUNK_VECTOR_INDEX} IF NOT EXISTS
+        FOR (c:Chunk) ON (c.embedding)
+        OPTIONS {{indexConfig: {{
+            `vector.dimensions`: {EMBEDDING_DIMENSIONS},
+            `vector.similarity_function`: 'cosine'
+        }}}}
+        """
+
+        with self.driver.session() as session:
+            session.run(query)
+            # Block until the index is online so searches can rely on it
+            session.run("CALL db.awaitIndexes(300)")
+
     def close(self):
-        """Close the driver connection."""
-        self.driver.close()
+        """Close the shared driver connection (call once, at shutdown)."""
+        close_driver()
+
+    def _write_batch(self, query, batch):
+        """
+        Write one batch in its own transaction. execute_write retries
+        transient errors such as deadlocks for a while; if they outlast it,
+        or the server is unreachable, the batch is retried here with
+        exponential backoff. Other errors, such as a bad query or a
+        constraint violation, fail the same way every time and are raised
+        immediately.
+        """
+        for attempt in range(NEO4J_IMPORT_RETRIES + 1):
+            try:
+                with self.driver.session() as session:
+                    session.execute_write(
+                        lambda tx: tx.run(query, data=batch).consume()
+                    )
+                return len(batch)
+            except (TransientError, ServiceUnavailable, SessionExpired) as e:
+                if attempt == NEO4J_IMPORT_RETRIES:
+                    raise
+                print(f"⚠️ Batch of {len(batch)} rows failed ({e}), retrying")
+                time.sleep(2**attempt)
+
+    def _import_batches(self, label, query, batches, workers=NEO4J_IMPORT_WORKERS):
+        """
+        UNWIND each batch of rows from `batches` into Neo4j, running up to
+        `workers` write sessions in parallel, and report rows/s. Batches
+        are pulled as sessions free up, so `batches` can stream from
+        SQLite. Returns the number of rows written.
+        """
+        started = time.perf_counter()
+        written = failed = 0
+        in_flight = {}
+
+        def collect(futures):
+            nonlocal written, failed
+            for future in futures:
+                size = in_flight.pop(future)
+                try:
+                    written += future.result()
+                except Exception as e:
+                    failed += size
+                    print(f"❌ {label}: batch of {size} rows failed: {e}")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for batch in batches:
+                # Keep a bounded number of batches in memory
+                if len(in_flight) >= workers * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                future = executor.submit(self._write_batch, query, batch)
+                in_flight[future] = len(batch)
+            collect(list(in_flight))
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"   {label}: {written} rows in {elapsed:.1f}s "
+            f"({written / max(elapsed, 1e-9):.0f} rows/s)"
+            + (f", {failed} failed" if failed else "")
+        )
+        if failed:
+            raise RuntimeError(f"{failed} {label} rows could not be imported")
+        return written
+
+    def sync(self, incremental=True):
+        """
+        Bring Neo4j up to date with SQLite: remove tombstoned nodes, then
+        import what changed since the last sync, or everything unless
+        `incremental`. Changes are read from SQLite's change_log, whose
+        watermark advances only after every step succeeds.
+        """
+        changed_after = None
+        if incremental:
+            watermark = SyncStateManager.get_watermark("neo4j_changes")
+            changed_after = int(watermark) if watermark is not None else None
+
+        # Rows written from here on are picked up again by the next sync
+        watermark = ChangeLogManager.get_last_seq()
+
+        # Deletions go first: a chunk id comes from its text, so a deleted
+        # chunk may be imported again
+        deleted = self.propagate_deletions()
+        print(f"✅ {deleted} deleted nodes removed from Neo4j!")
+
+        self.import_projects(changed_after=changed_after)
+        print("✅ Projects inserted into Neo4j!")
+
+        self.import_chunks(changed_after=changed_after)
+        print("✅ Chunks inserted and linked to projects in Neo4j!")
+
+        self.import_donations(changed_after=changed_after)
+        print("✅ Donations inserted into Neo4j!")
+
+        SyncStateManager.set_watermark("neo4j_changes", watermark)
+
+    def propagate_deletions(self):
+        """
+        DETACH DELETE the nodes of rows deleted (or projects delisted) in
+        SQLite, then clear their tombstones. Returns the number processed.
+        """
+        tombstones = TombstoneManager.get_tombstones()
+        if not tombstones:
+            return 0
 
-    def import_projects(self):
-        """Import all projects from SQLite into Neo4j."""
-        projectManager = ProjectManager()
+        ids_by_label = defaultdict(list)
+        for _, label, node_id in tombstones:
+            ids_by_label[label].append(node_id)
 
-        projects = projectManager.get_all_projects()
+        for label, ids in ids_by_label.items():
+            self._import_batches(
+                f"{label} deletions",
+                DELETE_QUERIES[label],
+                batched(ids, NEO4J_IMPORT_BATCH_SIZE),
+            )
 
+        TombstoneManager.clear_tombstones(tombstones[-1][0])
+        return len(tombstones)
+
+    def import_projects(self, changed_after=None):
+        """
+        Import listed projects from SQLite into Neo4j, only those changed
+        after change_log seq `changed_after` if it is given.
+        """
         query = """
         UNWIND $data AS row
         MERGE (p:Project {id: row.id})
@@ -69,8 +324,10 @@ class Neo4jImporter:
             p.github = row.socials.github,
             p.updated_at = row.updated_at
         ON MATCH SET 
+            p.title = row.title,
             p.raised_amount = row.raised_amount,
             p.giv_power = row.giv_power,
+            p.giv_power_rank = row.giv_power_rank,
             p.listed = row.listed,
             p.givbacks_eligible = row.givbacks_eligible,
             p.in_active_qf_round = row.in_active_qf_round,
@@ -102,35 +359,44 @@ class Neo4jImporter:
             p.updated_at = row.updated_at
         """
 
-        with self.driver.session() as session:
-            session.run(query, data=projects)
-
-    def import_chunks(self):
-        """Import all chunks from SQLite into Neo4j and link them to projects."""
-        chunkManager = ChunkManager()
-
-        chunks = chunkManager.get_all_chunks()
+        self._import_batches(
+            "projects",
+            query,
+            ProjectManager.iter_project_batches(NEO4J_IMPORT_BATCH_SIZE, changed_after),
+        )
 
+    def import_chunks(self, changed_after=None):
+        """
+        Import embedded chunks from SQLite into Neo4j and link them to
+        projects, only those changed after change_log seq `changed_after`
+        if it is given.
+        """
         query = """
         UNWIND $data AS row
         MATCH (p:Project {id: row.project_id})  // Ensure the project exists
         MERGE (c:Chunk {id: row.id})
         ON CREATE SET 
             c.text = row.text,
-            c.created_at = row.created_at,
-            c.embedding = row.embedding
+            c.created_at = row.created_at
+        SET c.embedding = row.embedding
         MERGE (p)-[:HAS_CHUNK]->(c)  // Create relationship
         """
 
-        with self.driver.session() as session:
-            session.run(query, data=chunks)
-
-    def import_donations(self):
-        """Import all donations from SQLite into Neo4j."""
-        donationManager = DonationManager()
-
-        donations = donationManager.get_all_donations()
+        # Batches are read in project order, so they lock mostly disjoint
+        # Project nodes and parallel sessions rarely deadlock on HAS_CHUNK
+        self._import_batches(
+            "chunks",
+            query,
+            ChunkManager.iter_chunk_batches(
+                NEO4J_IMPORT_CHUNK_BATCH_SIZE, changed_after
+            ),
+        )
 
+    def import_donations(self, changed_after=None):
+        """
+        Import donations from SQLite into Neo4j, only those changed after
+        change_log seq `changed_after` if it is given.
+        """
         query = """
         UNWIND $data AS row
         MATCH (p:Project {id: row.project_id})  // Ensure the project exists
@@ -149,14 +415,36 @@ class Neo4jImporter:
             d.chain_id = row.chain_id,
             d.token_address = row.token_address,
             d.chain_type = row.chain_type
+        ON MATCH SET 
+            d.project_id = row.project_id,
+            d.tx_hash = row.tx_hash,
+            d.to_address = row.to_address,
+            d.from_address = row.from_address,
+            d.currency = row.currency,
+            d.anonymous = row.anonymous,
+            d.amount = row.amount,
+            d.value_usd = row.value_usd,
+            d.created_at = row.created_at,
+            d.chain_id = row.chain_id,
+            d.token_address = row.token_address,
+            d.chain_type = row.chain_type
         MERGE (p)-[:HAS_DONATION]->(d)  // Create relationship
         """
 
-        with self.driver.session() as session:
-            session.run(query, data=donations)
+        self._import_batches(
+            "donations",
+            query,
+            DonationManager.iter_donation_batches(
+                NEO4J_IMPORT_BATCH_SIZE, changed_after
+            ),
+        )
+
 
+def main(incremental=True):
+    # Idempotent; creates the change_log and tombstone triggers on
+    # databases made by older versions
+    initialize_database()
 
-def main():
     importer = Neo4jImporter()
 
     try:
@@ -164,15 +452,12 @@ def main():
         connection_message = importer.test_connection()
         print(f"✅ {connection_message}")
 
-        # Import all data
-        importer.import_projects()
-        print("✅ Projects inserted into Neo4j!")
+        # Constraints make every MERGE an index lookup instead of a label
+        # scan; chunk similarity search runs on the vector index
+        importer.ensure_schema()
+        print("✅ Constraints and indexes ready!")
 
-        importer.import_chunks()
-        print("✅ Chunks inserted and linked to projects in Neo4j!")
-
-        importer.import_donations()
-        print("✅ Donations inserted into Neo4j!")
+        importer.sync(incremental=incremental)
 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -181,4 +466,12 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Import SQLite data into Neo4j")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="re-import every row instead of only those changed since the last import",
+    )
+    args = parser.parse_args()
+
+    main(incremental=not args.full)
@@ -0,0 +1,421 @@
+import time
+import queue
+import logging
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from database import (
+    ChunkManager,
+    DatabaseInitializer,
+    DonationManager,
+    ProjectManager,
+    SQLiteConnector,
+    SyncStateManager,
+    batched,
+    initialize_database,
+)
+from helper.chunking import chunk_text, description_hash, generate_chunk_uuid
+from helper.project_data_parser import extract_flat_project_data
+from embedding import batch_by_tokens
+from backfill_embeddings import EmbeddingBackfill
+from vector_store import (
+    add_to_vector_index,
+    rebuild_vector_indexes,
+    remove_from_vector_index,
+)
+from config.config import (
+    EMBEDDING_WORKERS,
+    PIPELINE_BATCH_SIZE,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_PROCESSES,
+    PIPELINE_REPORT_SECONDS,
+    SYNC_BATCH_SIZE,
+)
+
+logger = logging.getLogger("pipeline")
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# Schema version from which chunk ids include their project
+CHUNK_IDS_PER_PROJECT = 1
+
+
+class Stage:
+    """
+    A pipeline stage: `workers` threads take items from `inbox`, apply
+    `fn` and put non-empty results on `outbox`. With a process `pool`,
+    `fn` runs there instead, so CPU-bound work is not serialized by the
+    GIL. Once every worker has seen the end of its input the stage marks
+    the end of `outbox`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Any],
+        inbox: queue.Queue,
+        outbox: Optional[queue.Queue] = None,
+        workers: int = 1,
+        pool: Optional[ProcessPoolExecutor] = None,
+        size: Callable[[Any], int] = len,
+    ):
+        self.name = name
+        self.fn = fn
+        self.inbox = inbox
+        self.outbox = outbox
+        self.workers = workers
+        self.pool = pool
+        self.size = size
+        self.items = 0
+        self.errors = 0
+        self.busy = 0.0
+        self._remaining = workers
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"{self.name}-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self) -> None:
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+
+            started = time.monotonic()
+            try:
+                if self.pool is not None:
+                    result = self.pool.submit(self.fn, item).result()
+                else:
+                    result = self.fn(item)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                logger.error(f"{self.name}: dropped an item after error: {e}")
+                continue
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self.busy += elapsed
+
+            with self._lock:
+                self.items += self.size(item)
+            if self.outbox is not None and result:
+                self.outbox.put(result)
+
+        with self._lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+        if not last:
+            # Leave the marker for this stage's other workers
+            self.inbox.put(_DONE)
+        elif self.outbox is not None:
+            self.outbox.put(_DONE)
+
+
+class Source(Stage):
+    """A stage that feeds the items of an iterable into `outbox`."""
+
+    def __init__(self, name: str, iterable: Iterable, outbox: queue.Queue, **kwargs):
+        super().__init__(name, None, None, outbox, workers=1, **kwargs)
+        self.iterable = iterable
+
+    def _run(self) -> None:
+        try:
+            iterator = iter(self.iterable)
+            while True:
+                started = time.monotonic()
+                item = next(iterator, _DONE)
+                with self._lock:
+                    self.busy += time.monotonic() - started
+                if item is _DONE:
+                    break
+                with self._lock:
+                    self.items += self.size(item)
+                self.outbox.put(item)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logger.error(f"{self.name}: source failed: {e}")
+        finally:
+            self.outbox.put(_DONE)
+
+
+class Pipeline:
+    """Runs connected stages and reports each one's throughput."""
+
+    def __init__(self, report_seconds: float = PIPELINE_REPORT_SECONDS):
+        self.stages: List[Stage] = []
+        self.report_seconds = report_seconds
+        self._started = None
+
+    @staticmethod
+    def queue() -> queue.Queue:
+        """A bounded queue between two stages, for backpressure."""
+        return queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+    def add(self, stage: Stage) -> Stage:
+        self.stages.append(stage)
+        return stage
+
+    def run(self) -> None:
+        self._started = time.monotonic()
+        stop = threading.Event()
+        reporter = threading.Thread(target=self._report, args=(stop,), daemon=True)
+
+        for stage in self.stages:
+            stage.start()
+        reporter.start()
+
+        for stage in self.stages:
+            stage.join()
+        stop.set()
+        reporter.join()
+
+        logger.info("Pipeline finished")
+        self._log_throughput()
+
+    def _report(self, stop: threading.Event) -> None:
+        while not stop.wait(self.report_seconds):
+            self._log_throughput()
+
+    def _log_throughput(self) -> None:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        for stage in self.stages:
+            # Share of the stage's worker time spent processing items
+            utilization = stage.busy / (elapsed * stage.workers)
+            backlog = stage.inbox.qsize() if stage.inbox is not None else 0
+            logger.info(
+                f"{stage.name:>15}: {stage.items} items, "
+                f"{stage.items / elapsed:.1f}/s, "
+                f"{utilization:.0%} busy, {backlog} queued, {stage.errors} errors"
+            )
+
+
+def _chunked_description(project: Dict[str, Any]) -> Optional[str]:
+    # Incremental syncs also bring in delisted projects; they are saved so
+    # the listed flag updates, but have no chunks
+    return project["description"] if project["listed"] else None
+
+
+def clean_projects(rows: List[tuple]) -> List[Dict[str, Any]]:
+    """Parse raw project rows, cleaning and hashing their descriptions."""
+    projects = [extract_flat_project_data(row) for row in rows]
+    for project in projects:
+        project["description_hash"] = description_hash(_chunked_description(project))
+    return projects
+
+
+def detect_changes(projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Flag the projects whose description hash differs from the stored one."""
+    stored = ProjectManager.get_description_hashes([p["id"] for p in projects])
+    for project in projects:
+        project["description_changed"] = (
+            stored.get(project["id"]) != project["description_hash"]
+        )
+    return projects
+
+
+def chunk_projects(
+    projects: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str, int]]]:
+    """Split the changed descriptions of listed projects into chunk rows."""
+    chunk_rows = []
+    for project in projects:
+        if not project["description_changed"]:
+            continue
+        for chunk in chunk_text(_chunked_description(project)):
+            chunk_rows.append(
+                (generate_chunk_uuid(project["id"], chunk), chunk, project["id"])
+            )
+    return projects, chunk_rows
+
+
+def migrate_chunk_ids() -> int:
+    """
+    Move chunks stored under the text-only ids of older versions to
+    per-project ids, and rebuild the local vector indexes. A text-only id
+    was shared by every project with the same paragraph, so the chunk
+    belonged to whichever saved it last; every project is marked for
+    re-chunking to get back the chunks it lost that way. Returns the
+    number of chunks moved.
+    """
+    if DatabaseInitializer.get_schema_version() >= CHUNK_IDS_PER_PROJECT:
+        return 0
+
+    # Safe to run again if interrupted: rekeying maps new ids to themselves
+    moved = ChunkManager.rekey_chunks(generate_chunk_uuid)
+    ProjectManager.clear_description_hashes()
+    DatabaseInitializer.set_schema_version(CHUNK_IDS_PER_PROJECT)
+
+    if moved:
+        rebuild_vector_indexes()
+        logger.info(f"Moved {moved} chunks to per-project ids")
+    return moved
+
+
+def reconcile_projects(listed_ids: Optional[Set[int]] = None) -> None:
+    """
+    Delete the stored projects that no longer exist in Postgres, with
+    their chunks and donations. With `listed_ids`, every listed project
+    of a full sync, also delist the stored projects missing from it.
+    Either way the triggers tombstone them for the next Neo4j import.
+    """
+    removed = ProjectManager.get_project_ids() - (
+        ProjectManager.get_project_ids_from_postgres()
+    )
+    if removed:
+        remove_from_vector_index(ProjectManager.delete_projects(sorted(removed)))
+        logger.info(f"Deleted {len(removed)} projects removed from Postgres")
+
+    if listed_ids is not None:
+        delisted = ProjectManager.get_project_ids(listed_only=True) - listed_ids
+        if delisted:
+            ProjectManager.delist_projects(sorted(delisted))
+            logger.info(f"Delisted {len(delisted)} projects")
+
+
+def run_ingestion(
+    incremental: bool = False,
+    processes: int = PIPELINE_PROCESSES,
+    embed_workers: int = EMBEDDING_WORKERS,
+) -> None:
+    """
+    Sync projects and donations from Postgres and embed new chunks.
+
+    Stages, connected by bounded queues:
+        fetch (thread) -> clean (processes) -> diff (thread)
+        -> chunk (processes) -> persist (thread) -> embed (threads)
+        -> index (thread)
+    with donations streamed into SQLite alongside by their own stages.
+
+    Only projects whose description hash changed are re-chunked; chunks
+    their new description no longer contains are deleted from SQLite, the
+    local vector indexes and, through tombstones, the next Neo4j import.
+    Once every project has been read, projects deleted from Postgres are
+    deleted too, and, in full mode, projects no longer listed are delisted.
+    """
+    # Idempotent; brings databases created by older versions up to date
+    initialize_database()
+    migrate_chunk_ids()
+
+    updated_since = None
+    after_id = None
+    if incremental:
+        updated_since = SyncStateManager.get_watermark("projects") or "epoch"
+        after_id = int(SyncStateManager.get_watermark("donations") or 0)
+
+    backfill = EmbeddingBackfill(workers=embed_workers)
+    project_watermarks = []
+    donation_watermarks = []
+    orphaned_chunks = []
+    fetched_ids = set()
+
+    def persist(batch):
+        projects, chunk_rows = batch
+        # Chunks of changed projects that their new description no longer has
+        changed = [p["id"] for p in projects if p["description_changed"]]
+        current = {row[0] for row in chunk_rows}
+        orphans = [
+            chunk_id
+            for chunk_ids in ChunkManager.get_chunk_ids_by_project(changed).values()
+            for chunk_id in chunk_ids
+            if chunk_id not in current
+        ]
+
+        with SQLiteConnector.transaction():
+            ProjectManager.save_projects(projects)
+            ChunkManager.save_chunks(chunk_rows)
+            ChunkManager.delete_chunks(orphans)
+
+        orphaned_chunks.extend(orphans)
+        fetched_ids.update(p["id"] for p in projects)
+        project_watermarks.extend(p["updated_at"] for p in projects if p["updated_at"])
+        return ChunkManager.get_chunks_without_embedding(list(current))
+
+    def embed(chunks):
+        entries = []
+        for batch in batch_by_tokens(chunks):
+            entries.extend(backfill.embed_batch(batch))
+        return entries
+
+    def persist_donations(donations):
+        DonationManager.save_donations(donations)
+        donation_watermarks.append(max(d["id"] for d in donations))
+
+    rows = ProjectManager.stream_projects_from_postgres(updated_since, raw=True)
+    donations = DonationManager.stream_donations_from_postgres(after_id)
+
+    pipeline = Pipeline()
+    # Workers start on the first submit, from a stage thread; forking a
+    # process that runs other threads (psycopg2, the reporter) can deadlock
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("forkserver")
+    ) as pool:
+        fetched, cleaned, diffed, chunked, pending, embedded, donation_batches = (
+            Pipeline.queue() for _ in range(7)
+        )
+        project_stages = [
+            Source("fetch", batched(rows, PIPELINE_BATCH_SIZE), fetched),
+            Stage("clean", clean_projects, fetched, cleaned, processes, pool),
+            Stage("diff", detect_changes, cleaned, diffed),
+            Stage("chunk", chunk_projects, diffed, chunked, processes, pool),
+            Stage("persist", persist, chunked, pending, size=lambda b: len(b[0])),
+        ]
+        donation_stages = [
+            Source(
+                "fetch_donations", batched(donations, SYNC_BATCH_SIZE), donation_batches
+            ),
+            Stage("save_donations", persist_donations, donation_batches),
+        ]
+        for stage in project_stages + donation_stages:
+            pipeline.add(stage)
+        pipeline.add(Stage("embed", embed, pending, embedded, embed_workers))
+        pipeline.add(Stage("index", add_to_vector_index, embedded))
+
+        pipeline.run()
+
+    if orphaned_chunks:
+        # Skip chunks a later batch stored again
+        stored = ChunkManager.get_chunk_texts(orphaned_chunks)
+        remove_from_vector_index([c for c in orphaned_chunks if c not in stored])
+        logger.info(f"Deleted {len(orphaned_chunks)} orphaned chunks")
+
+    # Only a complete read shows which projects are gone
+    if not any(s.errors for s in project_stages):
+        reconcile_projects(None if incremental else fetched_ids)
+
+    # Batches finish out of order, so watermarks only advance once the
+    # whole run has been written, and not past rows that were dropped.
+    # Chunks that failed to embed are left for backfill_embeddings.
+    if incremental:
+        if project_watermarks and not any(s.errors for s in project_stages):
+            SyncStateManager.set_watermark("projects", max(project_watermarks))
+        if donation_watermarks and not any(s.errors for s in donation_stages):
+            SyncStateManager.set_watermark("donations", max(donation_watermarks))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the ingestion pipeline")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only fetch projects and donations changed since the last sync",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run_ingestion(incremental=args.incremental)
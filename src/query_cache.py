@@ -0,0 +1,231 @@
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+from database import DATA_DIR, decode_embedding, encode_embedding
+from config.config import (
+    QUERY_CACHE_TTL_SECONDS,
+    QUERY_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_SIMILARITY,
+)
+
+logger = logging.getLogger("query_cache")
+
+QUERY_CACHE_PATH = DATA_DIR / "query_cache.db"
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    text = re.sub(r"\s+", " ", (text or "").lower()).strip()
+    return text.rstrip(" .?!")
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+class CypherCache:
+    """
+    Persistent cache of generated Cypher queries.
+
+    Exact tier: plans are keyed on the normalized query text and output
+    format, so repeated requests skip the LLM entirely.
+
+    Semantic tier: a semantic plan only depends on the query vector through
+    $queryVector, so a new request can reuse an earlier plan when the rest
+    of its wording (the query with the embedding message removed) and the
+    output format are identical, and the two embedding messages have a
+    cosine similarity of at least `similarity_threshold`. Only the
+    two-step workflow consults this tier: the single-call planner returns
+    the Cypher query in the same LLM call that picks the embedding
+    message, so there is no generation left for a semantic hit to save.
+
+    Entries expire after `ttl` seconds and the least recently used ones
+    are evicted beyond `max_entries`. Plans written for different query
+    patterns (e.g. vector search backends) are kept apart by `namespace`.
+    """
+
+    def __init__(
+        self,
+        db_path=QUERY_CACHE_PATH,
+        ttl: float = QUERY_CACHE_TTL_SECONDS,
+        max_entries: int = QUERY_CACHE_MAX_ENTRIES,
+        similarity_threshold: float = QUERY_CACHE_SIMILARITY,
+        namespace: str = "",
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS query_plans (
+                key TEXT PRIMARY KEY,
+                template_key TEXT NOT NULL,
+                embedding_message TEXT,
+                cypher_query TEXT NOT NULL,
+                embedding BLOB,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_query_plans_template ON query_plans (template_key)"
+        )
+        self._connection.commit()
+
+    def request_key(self, request: Dict[str, Any]) -> str:
+        """Exact-match key for a request."""
+        return _hash(
+            self.namespace,
+            normalize_text(request["query"]),
+            normalize_text(request["output_format"]),
+        )
+
+    def template_key(self, request: Dict[str, Any], embedding_message: str) -> str:
+        """Key for the non-semantic part of a request."""
+        residue = normalize_text(request["query"]).replace(
+            normalize_text(embedding_message), "\x00"
+        )
+        return _hash(self.namespace, residue, normalize_text(request["output_format"]))
+
+    def get(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached plan for an identical request, if any."""
+        key = self.request_key(request)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT embedding_message, cypher_query, created_at FROM query_plans WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl:
+                self._connection.execute(
+                    "DELETE FROM query_plans WHERE key = ?", (key,)
+                )
+                self._connection.commit()
+                return None
+            self._touch(key, now)
+
+        return {
+            "embedding_needed": row[0] is not None,
+            "embedding_message": row[0],
+            "cypher_query": row[1],
+        }
+
+    def has_candidates(self, request: Dict[str, Any], embedding_message: str) -> bool:
+        """Whether any live semantic plan shares the request's template."""
+        with self._lock:
+            row = self._connection.execute(
+                """
+                SELECT 1 FROM query_plans
+                WHERE template_key = ? AND embedding IS NOT NULL AND created_at >= ?
+                LIMIT 1
+                """,
+                (self.template_key(request, embedding_message), time.time() - self.ttl),
+            ).fetchone()
+        return row is not None
+
+    def find_similar(
+        self,
+        request: Dict[str, Any],
+        embedding_message: str,
+        embedding: List[float],
+    ) -> Optional[Dict[str, Any]]:
+        """Return a semantic plan whose embedding is close enough to reuse."""
+        template_key = self.template_key(request, embedding_message)
+        now = time.time()
+        with self._lock:
+            rows = self._connection.execute(
+                """
+                SELECT key, embedding_message, cypher_query, embedding
+                FROM query_plans
+                WHERE template_key = ? AND embedding IS NOT NULL AND created_at >= ?
+                """,
+                (template_key, now - self.ttl),
+            ).fetchall()
+            if not rows:
+                return None
+
+            query = np.asarray(embedding, dtype=np.float32)
+            matrix = np.stack([decode_embedding(row[3]) for row in rows])
+            scores = (
+                matrix
+                @ query
+                / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+            )
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+            self._touch(rows[best][0], now)
+
+        logger.info(
+            f"Semantic cache hit ({scores[best]:.3f}): '{embedding_message}' -> '{rows[best][1]}'"
+        )
+        return {
+            "embedding_needed": True,
+            "embedding_message": embedding_message,
+            "cypher_query": rows[best][2],
+        }
+
+    def put(
+        self,
+        request: Dict[str, Any],
+        cypher_query: str,
+        embedding_message: Optional[str] = None,
+        embedding: Optional[List[float]] = None,
+    ) -> None:
+        """Store a plan that executed successfully."""
+        key = self.request_key(request)
+        if embedding_message:
+            template_key = self.template_key(request, embedding_message)
+        else:
+            template_key = key
+        blob = encode_embedding(embedding) if embedding is not None else None
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT OR REPLACE INTO query_plans
+                    (key, template_key, embedding_message, cypher_query, embedding, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, template_key, embedding_message, cypher_query, blob, now, now),
+            )
+            self._evict(now)
+            self._connection.commit()
+
+    def _touch(self, key: str, now: float) -> None:
+        self._connection.execute(
+            "UPDATE query_plans SET last_used = ? WHERE key = ?", (now, key)
+        )
+        self._connection.commit()
+
+    def _evict(self, now: float) -> None:
+        self._connection.execute(
+            "DELETE FROM query_plans WHERE created_at < ?", (now - self.ttl,)
+        )
+        self._connection.execute(
+            """
+            DELETE FROM query_plans WHERE key IN (
+                SELECT key FROM query_plans
+                ORDER BY last_used DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -1,5 +1,18 @@
-from neo4j_utils import Neo4jImporter
+from collections import defaultdict
+from neo4j_utils import get_driver, CHUNK_VECTOR_INDEX
 from utils.openai import generate_embedding
+from config.config import VECTOR_SEARCH_TOP_K, VECTOR_SEARCH_BACKEND
+from database import ChunkManager, ProjectManager
+from vector_store import load_vector_index
+
+_vector_indexes = {}
+
+
+def get_vector_index(backend):
+    """Load a local vector index ("numpy" or "ivf") once per process."""
+    if backend not in _vector_indexes:
+        _vector_indexes[backend] = load_vector_index(backend)
+    return _vector_indexes[backend]
 
 
 # def search_similar_projects(query_text, top_n=5):
@@ -22,22 +35,34 @@ from utils.openai import generate_embedding
 # query_text = "climate change impact on renewable energy"
 # results = search_similar_projects(query_text)
 # print(json.dumps(results, indent=4))
-def search_projects_with_chunks(query_text, similarity_threshold=0.7):
+def search_projects_with_chunks(
+    query_text,
+    similarity_threshold=0.7,
+    top_k=VECTOR_SEARCH_TOP_K,
+    backend=VECTOR_SEARCH_BACKEND,
+):
     """
     Perform a semantic search to return projects and their related chunks, ordered by average similarity.
+    The `top_k` nearest chunks come from the vector index; the threshold is applied to those.
+    With backend="numpy" (exact) or "ivf" (approximate) the chunks come from a local
+    vector index instead of Neo4j.
     """
     # Generate embedding for the query
     query_embedding = generate_embedding(query_text)
 
+    if backend != "neo4j":
+        return _search_local_index(
+            get_vector_index(backend), query_embedding, similarity_threshold, top_k
+        )
+
     # Define the Cypher query
-    query = """
-    MATCH (p:Project)-[:HAS_CHUNK]->(c:Chunk)
-    WHERE p.listed = true
-    WITH 
-        p, 
-        c,
-        gds.similarity.cosine(c.embedding, $queryVector) AS similarity
+    query = f"""
+    CALL db.index.vector.queryNodes('{CHUNK_VECTOR_INDEX}', $topK, $queryVector)
+    YIELD node AS c, score
+    WITH c, 2 * score - 1 AS similarity  // Index score is (1 + cosine) / 2
     WHERE similarity > $similarityThreshold
+    MATCH (p:Project)-[:HAS_CHUNK]->(c)
+    WHERE p.listed = true
     WITH 
         p.id AS project_id,
         p.title AS project_title,
@@ -72,7 +97,7 @@ def search_projects_with_chunks(query_text, similarity_threshold=0.7):
         p.telegram AS telegram,
         p.github AS github,
         AVG(similarity) AS average_similarity,  // Calculate average similarity
-        COLLECT({chunk_id: c.id, text: c.text, similarity: similarity}) AS related_chunks
+        COLLECT({{chunk_id: c.id, text: c.text, similarity: similarity}}) AS related_chunks
     RETURN 
         project_id,
         project_title,
@@ -112,71 +137,129 @@ def search_projects_with_chunks(query_text, similarity_threshold=0.7):
     """
 
     # Execute the query
-    importer = Neo4jImporter()
-    
-    with importer.get_driver() as driver:
-        with driver.session() as session:
-            result = session.run(
-                query,
-                parameters={
-                    "queryVector": query_embedding,  # Pass query embedding
-                    "similarityThreshold": similarity_threshold,  # Pass threshold
-                },
-            )
-            # Transform the results into a structured format
-            return [
-                {
-                    "project_id": record["project_id"],
-                    "project_title": record["project_title"],
-                    "raised_amount": record["raised_amount"],
-                    "giv_power": record["giv_power"],
-                    "giv_power_rank": record["giv_power_rank"],
-                    "givbacks_eligible": record["givbacks_eligible"],
-                    "in_active_qf_round": record["in_active_qf_round"],
-                    "unique_donors": record["unique_donors"],
-                    "owner_wallet": record["owner_wallet"],
-                    "ethereum_address": record["ethereum_address"],
-                    "polygon_address": record["polygon_address"],
-                    "optimism_address": record["optimism_address"],
-                    "celo_address": record["celo_address"],
-                    "base_address": record["base_address"],
-                    "arbitrum_address": record["arbitrum_address"],
-                    "gnosis_address": record["gnosis_address"],
-                    "zkevm_address": record["zkevm_address"],
-                    "ethereum_classic_address": record["ethereum_classic_address"],
-                    "stellar_address": record["stellar_address"],
-                    "solana_address": record["solana_address"],
-                    "x": record["x"],
-                    "facebook": record["facebook"],
-                    "instagram": record["instagram"],
-                    "youtube": record["youtube"],
-                    "linkedin": record["linkedin"],
-                    "reddit": record["reddit"],
-                    "discord": record["discord"],
-                    "farcaster": record["farcaster"],
-                    "lens": record["lens"],
-                    "website": record["website"],
-                    "telegram": record["telegram"],
-                    "github": record["github"],
-                    "average_similarity": record[
-                        "average_similarity"
-                    ],  # Include average similarity
-                    "related_chunks": record["related_chunks"],
-                }
-                for record in result
-            ]
+    with get_driver().session() as session:
+        result = session.run(
+            query,
+            parameters={
+                "queryVector": query_embedding,  # Pass query embedding
+                "similarityThreshold": similarity_threshold,  # Pass threshold
+                "topK": top_k,  # Nearest chunks to consider
+            },
+        )
+        # Transform the results into a structured format
+        return [
+            {
+                "project_id": record["project_id"],
+                "project_title": record["project_title"],
+                "raised_amount": record["raised_amount"],
+                "giv_power": record["giv_power"],
+                "giv_power_rank": record["giv_power_rank"],
+                "givbacks_eligible": record["givbacks_eligible"],
+                "in_active_qf_round": record["in_active_qf_round"],
+                "unique_donors": record["unique_donors"],
+                "owner_wallet": record["owner_wallet"],
+                "ethereum_address": record["ethereum_address"],
+                "polygon_address": record["polygon_address"],
+                "optimism_address": record["optimism_address"],
+                "celo_address": record["celo_address"],
+                "base_address": record["base_address"],
+                "arbitrum_address": record["arbitrum_address"],
+                "gnosis_address": record["gnosis_address"],
+                "zkevm_address": record["zkevm_address"],
+                "ethereum_classic_address": record["ethereum_classic_address"],
+                "stellar_address": record["stellar_address"],
+                "solana_address": record["solana_address"],
+                "x": record["x"],
+                "facebook": record["facebook"],
+                "instagram": record["instagram"],
+                "youtube": record["youtube"],
+                "linkedin": record["linkedin"],
+                "reddit": record["reddit"],
+                "discord": record["discord"],
+                "farcaster": record["farcaster"],
+                "lens": record["lens"],
+                "website": record["website"],
+                "telegram": record["telegram"],
+                "github": record["github"],
+                "average_similarity": record[
+                    "average_similarity"
+                ],  # Include average similarity
+                "related_chunks": record["related_chunks"],
+            }
+            for record in result
+        ]
+
+
+def _search_local_index(index, query_embedding, similarity_threshold, top_k, limit=5):
+    """
+    Same ranking as the Cypher search, computed from a local vector index
+    and the SQLite tables.
+    """
+    matches = index.search(query_embedding, top_k, similarity_threshold)
+    if not matches:
+        return []
+
+    chunks_by_project = defaultdict(list)
+    for chunk_id, project_id, similarity in matches:
+        chunks_by_project[project_id].append((chunk_id, similarity))
+
+    projects = {
+        project["id"]: project
+        for project in ProjectManager.get_projects_by_ids(list(chunks_by_project))
+        if project["listed"]
+    }
+    texts = ChunkManager.get_chunk_texts([chunk_id for chunk_id, _, _ in matches])
+
+    results = []
+    for project_id, chunks in chunks_by_project.items():
+        project = projects.get(project_id)
+        if project is None:
+            continue
+
+        result = {
+            "project_id": project["id"],
+            "project_title": project["title"],
+            "raised_amount": project["raised_amount"],
+            "giv_power": project["giv_power"],
+            "giv_power_rank": project["giv_power_rank"],
+            "givbacks_eligible": project["givbacks_eligible"],
+            "in_active_qf_round": project["in_active_qf_round"],
+            "unique_donors": project["unique_donors"],
+            "owner_wallet": project["owner_wallet"],
+        }
+        result.update(
+            {
+                f"{network}_address": address
+                for network, address in project["addresses"].items()
+            }
+        )
+        result.update(project["socials"])
+        result["average_similarity"] = sum(s for _, s in chunks) / len(chunks)
+        result["related_chunks"] = [
+            {
+                "chunk_id": chunk_id,
+                "text": texts.get(chunk_id),
+                "similarity": similarity,
+            }
+            for chunk_id, similarity in chunks
+        ]
+        results.append(result)
+
+    results.sort(key=lambda r: r["average_similarity"], reverse=True)
+    return results[:limit]
 
 
 # Example Usage
-query_text = "What are the effects of climate change on renewable energy?"
-results = search_projects_with_chunks(query_text)
-for project in results:
-    print(f"Project: {project['project_title']}")
-    print(
-        f"Raised Amount: {project['raised_amount']}, GIV Power: {project['giv_power']}"
-    )
-    print(f"Average Similarity: {project['average_similarity']:.2f}")
-    print("Related Chunks:")
-    for chunk in project["related_chunks"]:
-        print(f"  - {chunk['text']} (Similarity: {chunk['similarity']:.2f})")
-    print("\n")
+if __name__ == "__main__":
+    query_text = "What are the effects of climate change on renewable energy?"
+    results = search_projects_with_chunks(query_text)
+    for project in results:
+        print(f"Project: {project['project_title']}")
+        print(
+            f"Raised Amount: {project['raised_amount']}, GIV Power: {project['giv_power']}"
+        )
+        print(f"Average Similarity: {project['average_similarity']:.2f}")
+        print("Related Chunks:")
+        for chunk in project["related_chunks"]:
+            print(f"  - {chunk['text']} (Similarity: {chunk['similarity']:.2f})")
+        print("\n")
@@ -1,5 +1,5 @@
 from flask import Flask, request, jsonify
-import sqlite3
+import atexit
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -8,26 +8,43 @@ base_dir = os.path.dirname(os.path.abspath(__file__))
 db_path = os.path.join(base_dir, '..', 'data', 'local_data.db')
 
 from src.cypher_query import CypherQueryProcessor, schema_hint
+from src.api_keys import ApiKeyCache, UsageLogger
+from src.config.config import (
+    CYPHER_PLANNER,
+    QUERY_CACHE_ENABLED,
+    VECTOR_SEARCH_BACKEND,
+)
+from src.query_cache import CypherCache
+from src.vector_store import load_vector_index
 
 app = Flask(__name__)
 
+# One processor per process; it executes on the shared Neo4j driver pool
+query_processor = CypherQueryProcessor(
+    schema_hint,
+    planner=CYPHER_PLANNER,
+    cache=CypherCache(namespace=VECTOR_SEARCH_BACKEND) if QUERY_CACHE_ENABLED else None,
+    vector_index=(
+        load_vector_index(VECTOR_SEARCH_BACKEND)
+        if VECTOR_SEARCH_BACKEND != "neo4j"
+        else None
+    ),
+)
+
+# Valid and unknown keys are served from memory; see ApiKeyCache
+api_key_cache = ApiKeyCache(db_path)
+api_key_cache.start()
+
 def check_api_key(api_key):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM api_keys WHERE api_key = ?', (api_key,))
-    result = cursor.fetchone()
-    conn.close()
-    return result is not None
+    return api_key_cache.is_valid(api_key)
+
+# Usage rows are batched by a background writer and flushed at exit
+usage_logger = UsageLogger(db_path)
+usage_logger.start()
+atexit.register(usage_logger.stop)
 
 def log_api_key_usage(api_key, endpoint, request_body):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO api_key_usage (api_key, endpoint, timestamp, request_body)
-        VALUES (?, ?, CURRENT_TIMESTAMP, ?)
-    ''', (api_key, endpoint, request_body))
-    conn.commit()
-    conn.close()
+    usage_logger.log(api_key, endpoint, request_body)
 
 @app.route('/', methods=['GET'])
 def health_check():
@@ -51,7 +68,6 @@ def query():
     }
 
     try:
-        query_processor = CypherQueryProcessor(schema_hint)
         results = query_processor.process_user_request(user_request)
         return jsonify(results)
     except Exception as e:
@@ -0,0 +1,134 @@
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+from database import DATA_DIR, encode_embedding, decode_embedding
+from config.config import EMBEDDING_CACHE_MAX_ENTRIES
+
+EMBEDDING_CACHE_PATH = DATA_DIR / "embedding_cache.db"
+
+
+def text_hash(text: str) -> str:
+    """MD5 of the text, the cache's content address."""
+    return hashlib.md5(text.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed on (text hash, model name).
+
+    Shared by ingestion and query-time embedding, so identical text is only
+    ever embedded once per model. Beyond `max_entries` the least recently
+    used entries are evicted.
+    """
+
+    # Check the size limit every this many inserts rather than on each one
+    EVICT_EVERY = 500
+    # Hits are recorded in memory and written every this many, or with the
+    # next insert, so a lookup does not write to SQLite
+    TOUCH_EVERY = 200
+
+    def __init__(
+        self, db_path=EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES
+    ):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._touched = {}
+        self._connection = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                text_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (text_hash, model)
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._connection.commit()
+
+    def get_many(self, texts: List[str], model: str) -> Dict[str, List[float]]:
+        """Return cached embeddings for the given texts, keyed by text."""
+        hashes = {text_hash(text): text for text in texts}
+        found = {}
+        with self._lock:
+            keys = list(hashes)
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = self._connection.execute(
+                    f"""
+                    SELECT text_hash, embedding FROM embeddings
+                    WHERE model = ? AND text_hash IN ({placeholders})
+                    """,
+                    (model, *batch),
+                ).fetchall()
+                for key, blob in rows:
+                    found[hashes[key]] = decode_embedding(blob).tolist()
+
+            now = time.time()
+            for text in found:
+                self._touched[(text_hash(text), model)] = now
+            if len(self._touched) >= self.TOUCH_EVERY:
+                self._flush_touched()
+                self._connection.commit()
+
+        return found
+
+    def get(self, text: str, model: str) -> Optional[List[float]]:
+        """Return the cached embedding for `text`, if any."""
+        return self.get_many([text], model).get(text)
+
+    def put_many(self, embeddings: Dict[str, List[float]], model: str) -> None:
+        """Store embeddings keyed by their text."""
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                """
+                INSERT OR REPLACE INTO embeddings (text_hash, model, embedding, last_used)
+                VALUES (?, ?, ?, ?)
+                """,
+                [
+                    (text_hash(text), model, encode_embedding(embedding), now)
+                    for text, embedding in embeddings.items()
+                ],
+            )
+            self._flush_touched()
+            self._inserts += len(embeddings)
+            if self._inserts >= self.EVICT_EVERY:
+                self._inserts = 0
+                self._evict()
+            self._connection.commit()
+
+    def put(self, text: str, model: str, embedding: List[float]) -> None:
+        """Store one embedding."""
+        self.put_many({text: embedding}, model)
+
+    def _flush_touched(self) -> None:
+        if not self._touched:
+            return
+        self._connection.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE text_hash = ? AND model = ?",
+            [(used, key, model) for (key, model), used in self._touched.items()],
+        )
+        self._touched = {}
+
+    def _evict(self) -> None:
+        self._connection.execute(
+            """
+            DELETE FROM embeddings WHERE rowid IN (
+                SELECT rowid FROM embeddings
+                ORDER BY last_used DESC
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
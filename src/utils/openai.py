@@ -1,13 +1,54 @@
 from openai import OpenAI
-from config.config import OPENAI_API_KEY
+from config.config import (
+    OPENAI_API_KEY,
+    EMBEDDING_MODEL,
+    EMBEDDING_CACHE_ENABLED,
+)
+from utils.embedding_cache import EmbeddingCache
 
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
+# Embeddings are content addressed, so identical text is never embedded twice
+embedding_cache = EmbeddingCache() if EMBEDDING_CACHE_ENABLED else None
+
 def generate_embedding(text):
     """Generate embeddings using OpenAI's API."""
+    if embedding_cache is not None:
+        cached = embedding_cache.get(text, EMBEDDING_MODEL)
+        if cached is not None:
+            return cached
+
     response = openai_client.embeddings.create(
-        model="text-embedding-ada-002",
+        model=EMBEDDING_MODEL,
         input=text
     )
-    return response.data[0].embedding
+    embedding = response.data[0].embedding
+
+    if embedding_cache is not None:
+        embedding_cache.put(text, EMBEDDING_MODEL, embedding)
+    return embedding
+
+def generate_embeddings(texts):
+    """Generate embeddings for many texts with a single API request."""
+    texts = list(texts)
+    cached = (
+        embedding_cache.get_many(texts, EMBEDDING_MODEL)
+        if embedding_cache is not None
+        else {}
+    )
+    missing = list(dict.fromkeys(text for text in texts if text not in cached))
+
+    if missing:
+        response = openai_client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=missing
+        )
+        # Results carry the index of their input; keep the input order
+        fresh = {
+            missing[item.index]: item.embedding for item in response.data
+        }
+        if embedding_cache is not None:
+            embedding_cache.put_many(fresh, EMBEDDING_MODEL)
+        cached.update(fresh)
 
+    return [cached[text] for text in texts]
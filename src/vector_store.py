@@ -0,0 +1,609 @@
+import os
+import json
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from database import DATA_DIR, ChunkManager
+from config.config import (
+    EMBEDDING_DIMENSIONS,
+    IVF_COMPACT_FRACTION,
+    IVF_NLIST,
+    IVF_NPROBE,
+)
+
+logger = logging.getLogger("vector_store")
+
+VECTOR_STORE_DIR = DATA_DIR / "vectors"
+
+# Chunks deleted from SQLite since an index was built; searches skip them
+DELETED_IDS_FILE = "deleted_ids.json"
+
+
+def _load_deleted(directory: Path) -> Set[str]:
+    path = directory / DELETED_IDS_FILE
+    if not path.exists():
+        return set()
+    with open(path, "r") as f:
+        return set(json.load(f))
+
+
+def _save_deleted(directory: Path, chunk_ids: Set[str]) -> None:
+    tmp_path = directory / (DELETED_IDS_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(sorted(chunk_ids), f)
+    os.replace(tmp_path, directory / DELETED_IDS_FILE)
+
+
+class EmbeddingMatrix:
+    """
+    Exact cosine search over every chunk embedding, without Neo4j.
+
+    `build()` writes the embeddings from the SQLite `chunks` table as one
+    contiguous, L2-normalized float32 matrix plus parallel arrays of chunk
+    and project IDs. `load()` memory-maps them, so workers share the OS page
+    cache instead of each holding a copy. A search is one matrix-vector
+    product followed by `argpartition`. Chunks deleted after the build are
+    listed in a side file and skipped until the next build.
+    """
+
+    MATRIX_FILE = "embeddings.f32"
+    CHUNK_IDS_FILE = "chunk_ids.npy"
+    PROJECT_IDS_FILE = "project_ids.npy"
+    META_FILE = "meta.json"
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        chunk_ids: np.ndarray,
+        project_ids: np.ndarray,
+        deleted: Optional[Set[str]] = None,
+    ):
+        self.embeddings = embeddings
+        self.chunk_ids = chunk_ids
+        self.project_ids = project_ids
+        self.deleted = deleted or set()
+        self._deleted_rows = None
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    @classmethod
+    def build(
+        cls, directory: Path = VECTOR_STORE_DIR, dimensions: int = EMBEDDING_DIMENSIONS
+    ) -> "EmbeddingMatrix":
+        """Write the matrix files from SQLite and return the loaded matrix."""
+        directory.mkdir(parents=True, exist_ok=True)
+        count = ChunkManager.count_embeddings()
+
+        # Every file is written beside the live one and swapped in, so a
+        # server that has the old matrix mapped keeps reading a consistent copy
+        matrix_path = directory / cls.MATRIX_FILE
+        tmp_matrix_path = matrix_path.with_name(matrix_path.name + ".tmp")
+        matrix = np.memmap(
+            tmp_matrix_path,
+            dtype=np.float32,
+            mode="w+",
+            shape=(max(count, 1), dimensions),
+        )
+        chunk_ids, project_ids = [], []
+
+        # Rows added after count_embeddings() are picked up by the next build
+        for row, (chunk_id, project_id, embedding) in enumerate(
+            ChunkManager.iter_embeddings()
+        ):
+            if row >= count:
+                break
+            if embedding.shape[0] != dimensions:
+                logger.warning(f"Skipping chunk {chunk_id}: {embedding.shape[0]} dims")
+                continue
+            norm = np.linalg.norm(embedding)
+            matrix[len(chunk_ids)] = embedding / norm if norm else embedding
+            chunk_ids.append(chunk_id)
+            project_ids.append(project_id)
+
+        matrix.flush()
+        del matrix
+        os.replace(tmp_matrix_path, matrix_path)
+
+        _save_array(
+            directory / cls.CHUNK_IDS_FILE, np.asarray(chunk_ids, dtype="U32")
+        )
+        _save_array(
+            directory / cls.PROJECT_IDS_FILE, np.asarray(project_ids, dtype=np.int64)
+        )
+        _save_deleted(directory, set())
+
+        # Metadata goes last: load() reads it first to size the matrix
+        tmp_meta_path = directory / (cls.META_FILE + ".tmp")
+        with open(tmp_meta_path, "w") as f:
+            json.dump({"count": len(chunk_ids), "dimensions": dimensions}, f)
+        os.replace(tmp_meta_path, directory / cls.META_FILE)
+
+        logger.info(f"Built embedding matrix with {len(chunk_ids)} chunks")
+        return cls.load(directory)
+
+    @classmethod
+    def load(cls, directory: Path = VECTOR_STORE_DIR) -> "EmbeddingMatrix":
+        """Memory-map a matrix written by `build()`."""
+        with open(directory / cls.META_FILE, "r") as f:
+            meta = json.load(f)
+
+        count, dimensions = meta["count"], meta["dimensions"]
+        embeddings = np.memmap(
+            directory / cls.MATRIX_FILE,
+            dtype=np.float32,
+            mode="r",
+            shape=(max(count, 1), dimensions),
+        )[:count]
+        chunk_ids = np.load(directory / cls.CHUNK_IDS_FILE, mmap_mode="r")
+        project_ids = np.load(directory / cls.PROJECT_IDS_FILE, mmap_mode="r")
+
+        return cls(embeddings, chunk_ids, project_ids, _load_deleted(directory))
+
+    @classmethod
+    def exists(cls, directory: Path = VECTOR_STORE_DIR) -> bool:
+        """Whether a matrix has been built in `directory`."""
+        return (directory / cls.META_FILE).exists()
+
+    def search(
+        self,
+        query_vector: List[float],
+        k: int,
+        similarity_threshold: Optional[float] = None,
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Return up to `k` (chunk_id, project_id, similarity) tuples, most
+        similar first, keeping only those above `similarity_threshold`.
+        """
+        if len(self) == 0:
+            return []
+
+        query = np.array(query_vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        scores = self.embeddings @ query
+        if self.deleted:
+            if self._deleted_rows is None:
+                self._deleted_rows = np.isin(self.chunk_ids, list(self.deleted))
+            scores[self._deleted_rows] = -np.inf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])]
+        if similarity_threshold is not None:
+            top = top[scores[top] > similarity_threshold]
+
+        return [
+            (str(self.chunk_ids[i]), int(self.project_ids[i]), float(scores[i]))
+            for i in top
+        ]
+
+
+def _save_array(path: Path, array: np.ndarray) -> None:
+    # Write to a new file and swap it in, so memory maps of the old file
+    # (including the array being saved) stay valid
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class IVFIndex:
+    """
+    Approximate cosine search with an inverted file (IVF) index.
+
+    Normalized embeddings are clustered with spherical k-means into `nlist`
+    lists. A search scores the query against the centroids, then only
+    against the members of the `nprobe` closest lists, trading recall for
+    latency. Vectors added after the build are assigned to their closest
+    list and kept in a delta whose files `save()` only appends to.
+    Deleted chunks are skipped by searches; `compact()` folds the delta
+    into the sorted lists and drops them for good.
+    """
+
+    DIRECTORY = VECTOR_STORE_DIR / "ivf"
+    # Appended in this order, so the ids file never lists a row whose
+    # vector is not on disk yet
+    DELTA_EMBEDDINGS_FILE = "delta_embeddings.f32"
+    DELTA_IDS_FILE = "delta_ids.jsonl"
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        embeddings: np.ndarray,
+        offsets: np.ndarray,
+        chunk_ids: np.ndarray,
+        project_ids: np.ndarray,
+        nprobe: int = IVF_NPROBE,
+    ):
+        self.centroids = centroids
+        self.embeddings = embeddings
+        self.offsets = offsets
+        self.chunk_ids = chunk_ids
+        self.project_ids = project_ids
+        self.nprobe = nprobe
+
+        dimensions = centroids.shape[1]
+        self._delta_embeddings = np.empty((0, dimensions), dtype=np.float32)
+        self._delta_lists = np.empty(0, dtype=np.int64)
+        self._delta_chunk_ids: List[str] = []
+        self._delta_project_ids: List[int] = []
+        # Delta rows already in the files on disk
+        self._delta_saved = 0
+        self._deleted: Set[str] = set()
+        self._known_ids = None
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids) + len(self._delta_chunk_ids)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        nlist: int = IVF_NLIST,
+        nprobe: int = IVF_NPROBE,
+        iterations: int = 20,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """Cluster every stored chunk embedding and return the new index."""
+        rows = [
+            (chunk_id, project_id, embedding)
+            for chunk_id, project_id, embedding in ChunkManager.iter_embeddings()
+            if embedding.shape[0] == EMBEDDING_DIMENSIONS
+        ]
+        if not rows:
+            raise ValueError("No chunk embeddings to index")
+
+        vectors = _normalize(np.stack([row[2] for row in rows]).astype(np.float32))
+        nlist = min(nlist or max(1, int(np.sqrt(len(rows)))), len(rows))
+        centroids = cls._train(vectors, nlist, iterations, seed)
+        lists = cls._assign(vectors, centroids)
+
+        order = np.argsort(lists, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(lists, minlength=nlist))
+
+        logger.info(f"Built IVF index: {len(rows)} chunks in {nlist} lists")
+        return cls(
+            centroids,
+            vectors[order],
+            offsets,
+            np.asarray([rows[i][0] for i in order], dtype="U32"),
+            np.asarray([rows[i][1] for i in order], dtype=np.int64),
+            nprobe,
+        )
+
+    @staticmethod
+    def _train(
+        vectors: np.ndarray, nlist: int, iterations: int, seed: int
+    ) -> np.ndarray:
+        """Spherical k-means on a sample of the vectors."""
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), nlist * 256)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignments = IVFIndex._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = np.bincount(assignments, minlength=nlist) == 0
+            # Reseed empty lists with random sample points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = _normalize(sums)
+
+        return centroids
+
+    @staticmethod
+    def _assign(
+        vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192
+    ) -> np.ndarray:
+        """Index of the closest centroid for each vector."""
+        return np.concatenate(
+            [
+                np.argmax(vectors[i : i + batch_size] @ centroids.T, axis=1)
+                for i in range(0, len(vectors), batch_size)
+            ]
+        )
+
+    def _ensure_known_ids(self) -> None:
+        if self._known_ids is None:
+            self._known_ids = set(self.chunk_ids.tolist()) | set(self._delta_chunk_ids)
+
+    def add(self, chunk_id: str, project_id: int, embedding: List[float]) -> None:
+        """Insert a new chunk embedding into its closest list."""
+        self.add_many([(chunk_id, project_id, embedding)])
+
+    def add_many(self, entries: List[Tuple[str, int, List[float]]]) -> None:
+        """Insert new (chunk_id, project_id, embedding) entries at once."""
+        self._ensure_known_ids()
+        new = []
+        for chunk_id, project_id, embedding in entries:
+            if chunk_id in self._deleted:
+                # Chunk ids derive from their text, so the stored vector still fits
+                self._deleted.discard(chunk_id)
+            elif chunk_id not in self._known_ids:
+                self._known_ids.add(chunk_id)
+                new.append((chunk_id, project_id, embedding))
+        if not new:
+            return
+
+        vectors = _normalize(np.asarray([e[2] for e in new], dtype=np.float32))
+        self._delta_embeddings = np.concatenate([self._delta_embeddings, vectors])
+        self._delta_lists = np.concatenate(
+            [self._delta_lists, self._assign(vectors, self.centroids)]
+        )
+        self._delta_chunk_ids.extend(e[0] for e in new)
+        self._delta_project_ids.extend(int(e[1]) for e in new)
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        """Stop returning the given chunks from searches."""
+        self._ensure_known_ids()
+        self._deleted |= set(chunk_ids) & self._known_ids
+
+    def needs_compaction(self, fraction: float = IVF_COMPACT_FRACTION) -> bool:
+        """Whether the delta and deletions outgrow `fraction` of the lists."""
+        pending = len(self._delta_chunk_ids) + len(self._deleted)
+        return pending > fraction * max(len(self.chunk_ids), 1)
+
+    def search(
+        self,
+        query_vector: List[float],
+        k: int,
+        similarity_threshold: Optional[float] = None,
+        nprobe: Optional[int] = None,
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Return up to `k` (chunk_id, project_id, similarity) tuples from the
+        `nprobe` closest lists, most similar first.
+        """
+        query = _normalize(np.array(query_vector, dtype=np.float32))
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probed = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+
+        candidates = np.concatenate(
+            [np.arange(self.offsets[l], self.offsets[l + 1]) for l in probed]
+        )
+        scores = self.embeddings[candidates] @ query
+        chunk_ids = self.chunk_ids[candidates]
+        project_ids = self.project_ids[candidates]
+
+        if self._delta_chunk_ids:
+            in_probed = np.isin(self._delta_lists, probed)
+            scores = np.concatenate([scores, self._delta_embeddings[in_probed] @ query])
+            chunk_ids = np.concatenate(
+                [chunk_ids, np.asarray(self._delta_chunk_ids, dtype="U32")[in_probed]]
+            )
+            project_ids = np.concatenate(
+                [
+                    project_ids,
+                    np.asarray(self._delta_project_ids, dtype=np.int64)[in_probed],
+                ]
+            )
+
+        if self._deleted:
+            live = ~np.isin(chunk_ids, list(self._deleted))
+            scores, chunk_ids, project_ids = (
+                scores[live],
+                chunk_ids[live],
+                project_ids[live],
+            )
+
+        if len(scores) == 0:
+            return []
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        if similarity_threshold is not None:
+            top = top[scores[top] > similarity_threshold]
+
+        return [(str(chunk_ids[i]), int(project_ids[i]), float(scores[i])) for i in top]
+
+    def save(self, directory: Path = DIRECTORY) -> None:
+        """
+        Persist the delta rows added since the last save, plus the base
+        lists if they are not on disk yet.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        if not (directory / "meta.json").exists():
+            _save_array(directory / "centroids.npy", self.centroids)
+            _save_array(directory / "embeddings.npy", self.embeddings)
+            _save_array(directory / "offsets.npy", self.offsets)
+            _save_array(directory / "chunk_ids.npy", self.chunk_ids)
+            _save_array(directory / "project_ids.npy", self.project_ids)
+            (directory / self.DELTA_IDS_FILE).unlink(missing_ok=True)
+            (directory / self.DELTA_EMBEDDINGS_FILE).unlink(missing_ok=True)
+            self._delta_saved = 0
+            tmp_path = directory / "meta.json.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"nlist": self.nlist, "nprobe": self.nprobe}, f)
+            os.replace(tmp_path, directory / "meta.json")
+
+        saved, total = self._delta_saved, len(self._delta_chunk_ids)
+        if total > saved:
+            with open(directory / self.DELTA_EMBEDDINGS_FILE, "ab") as f:
+                # Drop rows a failed save wrote without their ids
+                f.truncate(saved * self._delta_embeddings[0].nbytes)
+                f.write(self._delta_embeddings[saved:].tobytes())
+            with open(directory / self.DELTA_IDS_FILE, "a") as f:
+                f.writelines(
+                    json.dumps([chunk_id, project_id]) + "\n"
+                    for chunk_id, project_id in zip(
+                        self._delta_chunk_ids[saved:], self._delta_project_ids[saved:]
+                    )
+                )
+            self._delta_saved = total
+        _save_deleted(directory, self._deleted)
+
+    @classmethod
+    def load(cls, directory: Path = DIRECTORY) -> "IVFIndex":
+        """Load an index written by `save()`; base lists are memory-mapped."""
+        with open(directory / "meta.json", "r") as f:
+            meta = json.load(f)
+
+        index = cls(
+            np.load(directory / "centroids.npy"),
+            np.load(directory / "embeddings.npy", mmap_mode="r"),
+            np.load(directory / "offsets.npy"),
+            np.load(directory / "chunk_ids.npy", mmap_mode="r"),
+            np.load(directory / "project_ids.npy", mmap_mode="r"),
+            meta["nprobe"],
+        )
+        ids_path = directory / cls.DELTA_IDS_FILE
+        if ids_path.exists():
+            with open(ids_path, "r") as f:
+                # A line still being written has no newline yet
+                entries = [json.loads(line) for line in f if line.endswith("\n")]
+            dimensions = index.centroids.shape[1]
+            vectors = np.fromfile(
+                directory / cls.DELTA_EMBEDDINGS_FILE,
+                dtype=np.float32,
+                count=len(entries) * dimensions,
+            ).reshape(-1, dimensions)
+            if entries:
+                index._delta_embeddings = vectors
+                index._delta_lists = cls._assign(vectors, index.centroids)
+                index._delta_chunk_ids = [entry[0] for entry in entries]
+                index._delta_project_ids = [entry[1] for entry in entries]
+                index._delta_saved = len(entries)
+        index._deleted = _load_deleted(directory)
+        return index
+
+    @classmethod
+    def exists(cls, directory: Path = DIRECTORY) -> bool:
+        """Whether an index has been saved to `directory`."""
+        return (directory / "meta.json").exists()
+
+    def compact(self, directory: Path = DIRECTORY) -> "IVFIndex":
+        """Merge the delta into the sorted lists and rewrite the index."""
+        lists = np.concatenate(
+            [np.repeat(np.arange(self.nlist), np.diff(self.offsets)), self._delta_lists]
+        )
+        chunk_ids = np.concatenate(
+            [self.chunk_ids, np.asarray(self._delta_chunk_ids, dtype="U32")]
+        )
+        # Deleted chunks are left out of the rewritten lists
+        live = ~np.isin(chunk_ids, list(self._deleted))
+        order = np.flatnonzero(live)[np.argsort(lists[live], kind="stable")]
+        offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(lists[live], minlength=self.nlist))
+
+        compacted = IVFIndex(
+            self.centroids,
+            np.concatenate([self.embeddings, self._delta_embeddings])[order],
+            offsets,
+            chunk_ids[order],
+            np.concatenate(
+                [self.project_ids, np.asarray(self._delta_project_ids, dtype=np.int64)]
+            )[order],
+            self.nprobe,
+        )
+        (directory / "meta.json").unlink(missing_ok=True)
+        compacted.save(directory)
+        return compacted
+
+
+def load_vector_index(backend: str):
+    """Load the local index for a search backend ("numpy" or "ivf")."""
+    if backend == "numpy":
+        return EmbeddingMatrix.load()
+    if backend == "ivf":
+        return IVFIndex.load()
+    raise ValueError(f"Unknown vector index backend: {backend}")
+
+
+_ivf_index = None
+
+
+def add_to_vector_index(entries: List[Tuple[str, int, List[float]]]) -> None:
+    """
+    Insert freshly stored (chunk_id, project_id, embedding) entries into the
+    IVF index, if one exists, and persist them once. The index is compacted
+    once its delta outgrows IVF_COMPACT_FRACTION of the lists.
+    """
+    global _ivf_index
+    if EmbeddingMatrix.exists():
+        # A chunk stored again under a deleted id is back in the matrix
+        deleted = _load_deleted(VECTOR_STORE_DIR)
+        restored = deleted & {chunk_id for chunk_id, _, _ in entries}
+        if restored:
+            _save_deleted(VECTOR_STORE_DIR, deleted - restored)
+
+    if _ivf_index is None:
+        if not IVFIndex.exists():
+            return
+        _ivf_index = IVFIndex.load()
+    _ivf_index.add_many(entries)
+    _save_ivf_index()
+
+
+def remove_from_vector_index(chunk_ids: List[str]) -> None:
+    """
+    Hide chunks deleted from SQLite from the embedding matrix and the IVF
+    index, if they exist. Processes that already loaded an index see the
+    change when they load it again.
+    """
+    global _ivf_index
+    if not chunk_ids:
+        return
+
+    if EmbeddingMatrix.exists():
+        _save_deleted(
+            VECTOR_STORE_DIR, _load_deleted(VECTOR_STORE_DIR) | set(chunk_ids)
+        )
+
+    if _ivf_index is None:
+        if not IVFIndex.exists():
+            return
+        _ivf_index = IVFIndex.load()
+    _ivf_index.remove(chunk_ids)
+    _save_ivf_index()
+
+
+def _save_ivf_index() -> None:
+    global _ivf_index
+    if _ivf_index.needs_compaction():
+        _ivf_index = _ivf_index.compact()
+        logger.info(f"Compacted IVF index: {len(_ivf_index)} chunks")
+    else:
+        _ivf_index.save()
+
+
+def rebuild_vector_indexes() -> None:
+    """Rebuild the embedding matrix and the IVF index, if they exist."""
+    global _ivf_index
+    if EmbeddingMatrix.exists():
+        EmbeddingMatrix.build()
+    if IVFIndex.exists():
+        _ivf_index = IVFIndex.build()
+        (IVFIndex.DIRECTORY / "meta.json").unlink(missing_ok=True)
+        _ivf_index.save()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--compact" in sys.argv:
+        index = IVFIndex.load().compact()
+        print(f"✅ IVF index compacted to {len(index)} chunks")
+    elif "--ivf" in sys.argv:
+        index = IVFIndex.build()
+        (IVFIndex.DIRECTORY / "meta.json").unlink(missing_ok=True)
+        index.save()
+        print(f"✅ IVF index built with {len(index)} chunks in {index.nlist} lists")
+    else:
+        matrix = EmbeddingMatrix.build()
+        print(
+            f"✅ Embedding matrix built with {len(matrix)} chunks in {VECTOR_STORE_DIR}"
+        )
@@ -0,0 +1,25 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modules under src/ import each other by top-level name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# utils.openai builds its client at import; no request is ever sent
+os.environ.setdefault("OPENAI_API_KEY", "test")
+# ...and opens its embedding cache under data/, which tests leave alone
+os.environ.setdefault("EMBEDDING_CACHE_ENABLED", "false")
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh SQLite database with the full schema, used by this thread."""
+    import database
+
+    database.SQLiteConnector.close_connection()
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "local_data.db")
+    database.DatabaseInitializer.create_tables()
+    yield database
+    database.SQLiteConnector.close_connection()
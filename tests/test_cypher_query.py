@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from cypher_query import parse_json_response
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('{"a": 1}', {"a": 1}),
+        ('  {"a": [1, 2]}\n', {"a": [1, 2]}),
+        ('```json\n{"a": true}\n```', {"a": True}),
+        ('```\n{"a": null}\n```', {"a": None}),
+        ('Here is the plan:\n{"a": 1}\nHope it helps.', {"a": 1}),
+        ('{"a": True, "b": False, "c": None}', {"a": True, "b": False, "c": None}),
+        ('Plan:\n```json\n{"a": None}\n```\nDone.', {"a": None}),
+    ],
+)
+def test_parse_json_response(text, expected):
+    assert parse_json_response(text) == expected
+
+
+def test_literals_inside_strings_are_kept():
+    text = '{"query": "True believers, None of them False", "embedding_needed": True}'
+    assert parse_json_response(text) == {
+        "query": "True believers, None of them False",
+        "embedding_needed": True,
+    }
+
+
+def test_escaped_quotes_inside_strings():
+    text = '{"q": "say \\"None\\" here", "ok": False}'
+    assert parse_json_response(text) == {"q": 'say "None" here', "ok": False}
+
+
+def test_valid_json_is_not_rewritten():
+    data = {"cypher": "MATCH (p) WHERE p.title = 'True' RETURN p", "n": None}
+    assert parse_json_response(json.dumps(data)) == data
+
+
+def test_invalid_json_raises():
+    with pytest.raises(json.JSONDecodeError):
+        parse_json_response("no json here")
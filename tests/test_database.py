@@ -0,0 +1,128 @@
+import json
+
+import numpy as np
+import pytest
+
+from database import decode_embedding, encode_embedding
+
+
+ADDRESSES = ["polygon", "optimism", "celo", "base", "arbitrum", "gnosis", "zkevm"]
+ADDRESSES += ["ethereum_classic", "stellar", "solana"]
+SOCIALS = ["x", "facebook", "instagram", "youtube", "linkedin", "reddit", "discord"]
+SOCIALS += ["farcaster", "lens", "website", "telegram", "github"]
+
+
+def project(project_id, **fields):
+    data = {"id": project_id, "title": f"Project {project_id}", "updated_at": "2024-01-01"}
+    data.update({f"{chain}_address": None for chain in ADDRESSES})
+    data.update({social: None for social in SOCIALS})
+    data.update(fields)
+    return data
+
+
+def changes(db):
+    return db.SQLiteConnector.execute_query(
+        "SELECT label, node_id FROM change_log ORDER BY seq"
+    )
+
+
+def tombstones(db):
+    return [(label, node_id) for _, label, node_id in db.TombstoneManager.get_tombstones()]
+
+
+def test_embedding_round_trip():
+    embedding = np.random.default_rng(0).standard_normal(1536).astype(np.float32)
+    decoded = decode_embedding(encode_embedding(embedding))
+    assert decoded.dtype == np.float32
+    np.testing.assert_array_equal(decoded, embedding)
+
+
+def test_embedding_round_trip_from_list():
+    decoded = decode_embedding(encode_embedding([0.5, -1.25, 3.0]))
+    assert decoded.tolist() == [0.5, -1.25, 3.0]
+
+
+def test_decode_legacy_formats():
+    values = [0.5, -1.25, 3.0]
+    assert decode_embedding(None) is None
+    assert decode_embedding(json.dumps(values)).tolist() == values
+    assert decode_embedding(json.dumps(values).encode()).tolist() == values
+    assert decode_embedding(np.asarray(values, dtype=np.float32).tobytes()).tolist() == values
+
+
+def test_decode_rejects_unknown_version():
+    blob = bytearray(encode_embedding([1.0]))
+    blob[3] += 1
+    with pytest.raises(ValueError):
+        decode_embedding(bytes(blob))
+
+
+def test_inserts_and_updates_are_logged_in_write_order(db):
+    db.ProjectManager.save_projects([project(1), project(2)])
+    db.ChunkManager.save_chunks([("c1", "text", 1)])
+    db.ProjectManager.save_project(project(1, raised_amount=10))
+
+    assert changes(db) == [("Project", 2), ("Chunk", "c1"), ("Project", 1)]
+
+
+def test_unchanged_upsert_is_not_logged(db):
+    db.ProjectManager.save_projects([project(1), project(2)])
+    last_seq = db.ChangeLogManager.get_last_seq()
+    db.ProjectManager.save_project(project(1))
+
+    assert db.ChangeLogManager.get_last_seq() == last_seq
+    assert changes(db) == [("Project", 1), ("Project", 2)]
+
+
+def test_chunk_embedding_is_logged(db):
+    db.ProjectManager.save_project(project(1))
+    db.ChunkManager.save_chunks([("c1", "text", 1), ("c2", "more", 1)])
+    db.ChunkManager.set_embeddings([("c1", [1.0, 0.0])])
+
+    assert changes(db)[-1] == ("Chunk", "c1")
+
+
+def test_delete_writes_tombstone_and_drops_change(db):
+    db.ProjectManager.save_project(project(1))
+    db.ChunkManager.save_chunks([("c1", "text", 1), ("c2", "more", 1)])
+    db.ChunkManager.delete_chunks(["c1"])
+
+    assert ("Chunk", "c1") not in changes(db)
+    assert tombstones(db) == [("Chunk", "c1")]
+
+
+def test_delete_projects_tombstones_their_chunks(db):
+    db.ProjectManager.save_projects([project(1), project(2)])
+    db.ChunkManager.save_chunks([("c1", "text", 1), ("c2", "more", 2)])
+
+    assert db.ProjectManager.delete_projects([1]) == ["c1"]
+    assert set(tombstones(db)) == {("Chunk", "c1"), ("Project", "1")}
+    assert changes(db) == [("Project", 2), ("Chunk", "c2")]
+
+
+def test_delisting_tombstones_and_relisting_restores(db):
+    db.ProjectManager.save_project(project(1))
+    db.ChunkManager.save_chunks([("c1", "text", 1)])
+
+    db.ProjectManager.save_project(project(1, listed=False))
+    assert tombstones(db) == [("Project", "1")]
+
+    delisted_seq = db.ChangeLogManager.get_last_seq()
+    db.ProjectManager.save_project(project(1, listed=True))
+    assert tombstones(db) == []
+    # The chunk Neo4j dropped with the project is exported again
+    relisted = db.SQLiteConnector.execute_query(
+        "SELECT label, node_id FROM change_log WHERE seq > ?", (delisted_seq,)
+    )
+    assert set(relisted) == {("Project", 1), ("Chunk", "c1")}
+
+
+def test_clear_tombstones_keeps_later_ones(db):
+    db.ProjectManager.save_project(project(1))
+    db.ChunkManager.save_chunks([("c1", "text", 1), ("c2", "more", 1)])
+    db.ChunkManager.delete_chunks(["c1"])
+    up_to_rowid = db.TombstoneManager.get_tombstones()[-1][0]
+    db.ChunkManager.delete_chunks(["c2"])
+
+    db.TombstoneManager.clear_tombstones(up_to_rowid)
+    assert tombstones(db) == [("Chunk", "c2")]
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from helper.html_cleaner import clean_html, clean_html_soup
+
+# Markup where a streaming cleaner can drift from BeautifulSoup's tree:
+# text-node boundaries at stray and void end tags, character references
+# BeautifulSoup replaces, and text it leaves out
+CASES = [
+    "<p><strong>Welcome!</strong> This is <a href='#'>an example</a>. &copy; 2024</p>",
+    "a&#0;b",
+    "a&#x0;b",
+    "a&#128;b&#x80;c",
+    "a&#xD800;b&#55296;c",
+    "a&#1114112;b",
+    "&#9;&#12;&#13;&#1;",
+    "&amp;&nbsp;&foo &mdash;&hellip;",
+    "a</br>b",
+    "<p>a<b>c</br>d</b>e</p>",
+    "<div><span>a</br>b</span></div>",
+    "<b>x<br>y</br>z</b>",
+    "<p><i>a</br></i>b</p>",
+    "<br><br/>a</br>b",
+    "<input><input/>&#0;</input>&#;",
+    "<img src='x'>a</img>b<hr/>c</hr>d",
+    "<ul><li>one<li>two</ul>three",
+    "a<script>var x = '<p>';</script>b<style>p {}</style>c",
+    "<template><p>hidden</p></template>shown",
+    "<ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>",
+    "a<!-- comment -->b<!DOCTYPE html>c<?pi?>d",
+    "<![CDATA[raw <text>]]>after",
+    "<p>unclosed <b>bold <i>italic",
+    "</p></div>only end tags",
+    "&#x;&#;&&lt;",
+]
+
+TAGS = ["p", "b", "i", "span", "div", "br", "li", "ul", "td", "a", "img", "hr"]
+TAGS += ["script", "style", "template", "rt", "input", "h1"]
+PIECES = ["text", " ", "\n", "a b", "&", "<", "&#0;", "&#x0;", "&#128;", "&#65;"]
+PIECES += ["&amp;", "&nbsp;", "&foo", "&#xD800;", "&#12;", "&#x;", "<!-- c -->"]
+PIECES += ["<![CDATA[x]]>", "<!DOCTYPE html>", "<?pi?>"]
+
+
+def random_documents(count, seed=0):
+    """Random tag soup built from the pieces above."""
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 25)):
+            roll, tag = rng.random(), rng.choice(TAGS)
+            if roll < 0.3:
+                parts.append(f"<{tag}>")
+            elif roll < 0.5:
+                parts.append(f"</{tag}>")
+            elif roll < 0.55:
+                parts.append(f"<{tag}/>")
+            else:
+                parts.append(rng.choice(PIECES))
+        documents.append("".join(parts))
+    return documents
+
+
+@pytest.mark.parametrize("document", CASES)
+def test_clean_html_matches_beautifulsoup(document):
+    assert clean_html(document) == clean_html_soup(document)
+
+
+def test_clean_html_matches_beautifulsoup_on_random_markup():
+    mismatches = [
+        document
+        for document in random_documents(3000)
+        if clean_html(document) != clean_html_soup(document)
+    ]
+    assert mismatches == []
+
+
+def test_clean_html_output():
+    document = "<p><strong>Welcome!</strong> This is <a href='#'>an example</a>.</p>"
+    assert clean_html(document) == "Welcome! This is an example ."
@@ -0,0 +1,102 @@
+import pytest
+
+from query_cache import CypherCache
+
+SEMANTIC_REQUEST = {
+    "query": "Show projects about clean water in Africa",
+    "output_format": "table",
+}
+SEMANTIC_PLAN = "MATCH (p:Project) WHERE similarity > 0.7 RETURN p"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CypherCache(tmp_path / "query_cache.db", ttl=60, similarity_threshold=0.9)
+    yield cache
+    cache.close()
+
+
+def test_exact_hit_ignores_case_and_punctuation(cache):
+    cache.put({"query": "Top 10 projects", "output_format": "list"}, "MATCH (p) RETURN p")
+
+    hit = cache.get({"query": "  top 10   PROJECTS?", "output_format": "List"})
+    assert hit == {
+        "embedding_needed": False,
+        "embedding_message": None,
+        "cypher_query": "MATCH (p) RETURN p",
+    }
+    assert cache.get({"query": "Top 10 projects", "output_format": "table"}) is None
+
+
+def test_semantic_hit_reuses_plan_of_same_template(cache):
+    cache.put(SEMANTIC_REQUEST, SEMANTIC_PLAN, "clean water in Africa", [1.0, 0.0, 0.0])
+    request = {"query": "Show projects about drinking water access", "output_format": "table"}
+
+    assert cache.get(request) is None
+    assert cache.has_candidates(request, "drinking water access")
+    hit = cache.find_similar(request, "drinking water access", [0.95, 0.1, 0.0])
+    assert hit == {
+        "embedding_needed": True,
+        "embedding_message": "drinking water access",
+        "cypher_query": SEMANTIC_PLAN,
+    }
+
+
+def test_semantic_miss_below_threshold(cache):
+    cache.put(SEMANTIC_REQUEST, SEMANTIC_PLAN, "clean water in Africa", [1.0, 0.0, 0.0])
+    request = {"query": "Show projects about animal shelters", "output_format": "table"}
+
+    assert cache.find_similar(request, "animal shelters", [0.0, 1.0, 0.0]) is None
+
+
+def test_semantic_miss_for_other_template(cache):
+    cache.put(SEMANTIC_REQUEST, SEMANTIC_PLAN, "clean water in Africa", [1.0, 0.0, 0.0])
+    request = {"query": "Count donations to clean water in Africa", "output_format": "table"}
+
+    assert not cache.has_candidates(request, "clean water in Africa")
+    assert cache.find_similar(request, "clean water in Africa", [1.0, 0.0, 0.0]) is None
+
+
+def test_namespaces_are_kept_apart(tmp_path):
+    path = tmp_path / "query_cache.db"
+    numpy_cache = CypherCache(path, namespace="numpy")
+    neo4j_cache = CypherCache(path, namespace="neo4j")
+    numpy_cache.put(SEMANTIC_REQUEST, SEMANTIC_PLAN)
+
+    assert neo4j_cache.get(SEMANTIC_REQUEST) is None
+    assert numpy_cache.get(SEMANTIC_REQUEST) is not None
+    numpy_cache.close()
+    neo4j_cache.close()
+
+
+def test_expired_entries_are_missed_and_dropped(cache, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr("query_cache.time.time", lambda: now)
+    cache.put(SEMANTIC_REQUEST, SEMANTIC_PLAN, "clean water in Africa", [1.0, 0.0, 0.0])
+
+    now += 61
+    assert not cache.has_candidates(SEMANTIC_REQUEST, "clean water in Africa")
+    assert cache.find_similar(SEMANTIC_REQUEST, "clean water in Africa", [1.0, 0.0, 0.0]) is None
+    assert cache.get(SEMANTIC_REQUEST) is None
+    count = cache._connection.execute("SELECT COUNT(*) FROM query_plans").fetchone()[0]
+    assert count == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr("query_cache.time.time", lambda: now)
+    cache = CypherCache(tmp_path / "query_cache.db", max_entries=2)
+    requests = [{"query": f"query {i}", "output_format": "list"} for i in range(3)]
+
+    cache.put(requests[0], "RETURN 0")
+    now += 1
+    cache.put(requests[1], "RETURN 1")
+    now += 1
+    cache.get(requests[0])
+    now += 1
+    cache.put(requests[2], "RETURN 2")
+
+    assert cache.get(requests[1]) is None
+    assert cache.get(requests[0])["cypher_query"] == "RETURN 0"
+    assert cache.get(requests[2])["cypher_query"] == "RETURN 2"
+    cache.close()
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from config.config import EMBEDDING_DIMENSIONS
+from vector_store import IVFIndex
+
+rng = np.random.default_rng(0)
+CENTERS = rng.standard_normal((8, EMBEDDING_DIMENSIONS)).astype(np.float32)
+
+
+def embedding(cluster, seed):
+    noise = np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSIONS)
+    return (CENTERS[cluster] + 0.1 * noise).astype(np.float32)
+
+
+@pytest.fixture
+def index(db):
+    chunks = [(f"c{i}", f"text {i}", i % 4) for i in range(200)]
+    db.ChunkManager.save_chunks(chunks)
+    db.ChunkManager.set_embeddings(
+        [(chunk_id, embedding(i % 8, i)) for i, (chunk_id, _, _) in enumerate(chunks)]
+    )
+    return IVFIndex.build(nlist=8, nprobe=8)
+
+
+def search_ids(index, query, k=5):
+    return [chunk_id for chunk_id, _, _ in index.search(query, k)]
+
+
+def test_build_finds_nearest_chunk(index):
+    assert len(index) == 200
+    assert search_ids(index, embedding(3, 11))[0] == "c11"
+
+
+def test_add_is_searchable_and_ignores_known_ids(index):
+    vector = embedding(5, 1000)
+    index.add_many([("new", 7, vector), ("c0", 0, embedding(0, 0))])
+
+    assert len(index) == 201
+    assert index.search(vector, 1)[0][:2] == ("new", 7)
+    index.add("new", 7, vector)
+    assert len(index) == 201
+
+
+def test_remove_hides_chunks_until_added_again(index):
+    index.remove(["c11", "unknown"])
+    assert "c11" not in search_ids(index, embedding(3, 11), k=200)
+    assert index.needs_compaction(fraction=0)
+    assert not index.needs_compaction(fraction=0.5)
+
+    index.add("c11", 3, embedding(3, 11))
+    assert search_ids(index, embedding(3, 11))[0] == "c11"
+
+
+def test_save_appends_delta_and_load_restores_it(index, tmp_path):
+    directory = tmp_path / "ivf"
+    index.save(directory)
+    index.add("new1", 1, embedding(1, 1001))
+    index.save(directory)
+    index.add("new2", 2, embedding(2, 1002))
+    index.remove(["c5"])
+    index.save(directory)
+
+    delta = (directory / IVFIndex.DELTA_EMBEDDINGS_FILE).stat().st_size
+    assert delta == 2 * EMBEDDING_DIMENSIONS * 4
+    loaded = IVFIndex.load(directory)
+    assert len(loaded) == 202
+    assert search_ids(loaded, embedding(2, 1002))[0] == "new2"
+    assert "c5" not in search_ids(loaded, embedding(5, 5), k=200)
+
+
+def test_load_skips_partially_written_delta(index, tmp_path):
+    directory = tmp_path / "ivf"
+    index.add("new1", 1, embedding(1, 1001))
+    index.save(directory)
+    with open(directory / IVFIndex.DELTA_EMBEDDINGS_FILE, "ab") as f:
+        f.write(embedding(2, 1002).tobytes())
+    with open(directory / IVFIndex.DELTA_IDS_FILE, "a") as f:
+        f.write('["new2", ')
+
+    assert len(IVFIndex.load(directory)) == 201
+
+
+def test_compact_folds_delta_and_drops_deleted(index, tmp_path):
+    directory = tmp_path / "ivf"
+    index.save(directory)
+    index.add("new1", 1, embedding(1, 1001))
+    index.remove(["c5", "c6"])
+    index.save(directory)
+    query = embedding(1, 1001)
+    expected = index.search(query, 20)
+
+    compacted = index.compact(directory)
+    assert len(compacted) == 199
+    assert not compacted.needs_compaction(fraction=0)
+    assert not (directory / IVFIndex.DELTA_IDS_FILE).exists()
+    assert compacted.search(query, 20) == pytest.approx(expected)
+
+    loaded = IVFIndex.load(directory)
+    assert len(loaded) == 199
+    assert "c5" not in loaded.chunk_ids
+    assert loaded.search(query, 20) == pytest.approx(expected)